@@ -0,0 +1,34 @@
+import json
+import os
+import platform
+import sys
+from typing import Iterable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import schedulergodx
+
+
+def percentiles(values: Iterable[float], scale: float = 1000) -> dict:
+    values = sorted(values)
+    if not values:
+        return {'p50': None, 'p99': None, 'max': None}
+    at = lambda q: round(values[min(int(q * len(values)), len(values) - 1)] * scale, 3)
+    return {'p50': at(0.5), 'p99': at(0.99), 'max': round(values[-1] * scale, 3)}
+
+
+def environment() -> dict:
+    return {
+        'schedulergodx': schedulergodx.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def dump(report: dict) -> None:
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write('\n')
@@ -0,0 +1,72 @@
+import argparse
+import time
+from typing import Callable
+
+from _common import dump
+
+from schedulergodx.utils import (BINARY_CODEC, JSON_CODEC, Codec,
+                                 MessageConstructor)
+
+
+def _sample(x: int, y: int = 2) -> int:
+    return x * y
+
+
+def messages() -> dict[str, dict]:
+    return {
+        'task-inline-function': MessageConstructor.task(
+            id = '01J0000000000000000000000', client = 'bench', lifetime = 3,
+            func = _sample, func_args = (1,), func_kwargs = {'y': 3}
+        ),
+        'task-function-hash': MessageConstructor.task(
+            id = '01J0000000000000000000000', client = 'bench', lifetime = 3,
+            func = None, func_args = (1,), func_kwargs = {'y': 3},
+            function_hash = MessageConstructor.function_hash(MessageConstructor.dumps(_sample))
+        ),
+        'task-64kb-argument': MessageConstructor.task(
+            id = '01J0000000000000000000000', client = 'bench', lifetime = 3,
+            func = None, func_args = (b'x' * 65536,), func_kwargs = {},
+            function_hash = MessageConstructor.function_hash(MessageConstructor.dumps(_sample))
+        ),
+        'task-batch-100': MessageConstructor.task_batch(
+            id = '01J0000000000000000000000', client = 'bench', lifetime = 3, func = _sample,
+            tasks = [(f'01J{i:023}', (i,), {'y': 3}) for i in range(100)]
+        ),
+    }
+
+
+def _rate(func: Callable[[], object], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return number / (time.perf_counter() - start)
+
+
+def bench(codec: Codec, message: dict, number: int) -> dict:
+    body = codec.encode(message)
+    return {
+        'codec': codec.content_type,
+        'payload_bytes': len(body),
+        'encode_per_s': round(_rate(lambda: codec.encode(message), number)),
+        'decode_per_s': round(_rate(lambda: MessageConstructor.disassemble(body, codec.content_type), number)),
+    }
+
+
+def run(number: int = 2000) -> dict:
+    results = [
+        {'message': name, **bench(codec, message, number)}
+        for name, message in messages().items()
+        for codec in (JSON_CODEC, BINARY_CODEC)
+    ]
+    return {'benchmark': 'codec', 'number': number, 'results': results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compare message codecs: throughput and payload size')
+    parser.add_argument('--number', type=int, default=2000, help='iterations per measurement')
+    args = parser.parse_args()
+    dump(run(args.number))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+
+from _common import dump, percentiles
+
+from schedulergodx.client import Client
+from schedulergodx.service import Service
+from schedulergodx.utils import DB, Durability, MemoryConnect
+
+
+def lag(sent: float) -> float:
+    return time.time() - sent
+
+
+def _stop(service: Service, thread: threading.Thread) -> None:
+    service.consumer.stop_consuming()
+    thread.join(30)
+
+
+def _collect(client: Client, ids: queue.SimpleQueue, lags: list[float], timeout: float) -> None:
+    while (task_id := ids.get()) is not None:
+        lags.append(client.get_result(task_id, timeout))
+
+
+def bench(tasks: int, batch: int, workers: int, durability: Durability, directory: str) -> dict:
+    transport = MemoryConnect()
+    service = Service(rmq_connect=transport, max_workers=workers, durability=durability,
+                      db=DB(f'sqlite:///{os.path.join(directory, f"{durability.name.lower()}.db")}', service_db=True))
+    service.logger.setLevel(logging.WARNING)
+    thread = threading.Thread(target=service.start, daemon=True)
+    thread.start()
+    try:
+        client = Client(name='bench', rmq_connect=transport)
+        client.logger.setLevel(logging.WARNING)
+        task = client.task(lag)
+        client.get_result(task.launch(time.time()), 30)
+
+        ids: queue.SimpleQueue = queue.SimpleQueue()
+        lags: list[float] = []
+        collector = threading.Thread(target=_collect, args=(client, ids, lags, 60))
+        collector.start()
+        started = time.perf_counter()
+        for _ in range(tasks):
+            ids.put(task.launch(time.time()))
+        launched = time.perf_counter() - started
+        client.flush()
+        confirmed = time.perf_counter() - started
+        ids.put(None)
+        collector.join()
+        completed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        batches = [task.launch_many([(time.time(),)] * batch) for _ in range(max(tasks // batch, 1))]
+        batch_lags = [client.get_result(task_id, 60) for launched_batch in batches for task_id in launched_batch.ids]
+        batch_completed = time.perf_counter() - started
+    finally:
+        _stop(service, thread)
+    return {
+        'durability': durability.name,
+        'workers': workers,
+        'tasks': tasks,
+        'launches_per_s': round(tasks / launched),
+        'confirmed_per_s': round(tasks / confirmed),
+        'completed_per_s': round(tasks / completed),
+        'dispatch_lag_ms': percentiles(lags),
+        'batch_size': batch,
+        'batch_completed_per_s': round(len(batch_lags) / batch_completed),
+        'batch_dispatch_lag_ms': percentiles(batch_lags),
+    }
+
+
+def run(tasks: int = 2000, batch: int = 100, workers: int = 10,
+        durabilities: list[str] = ('GROUP',)) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        results = [bench(tasks, batch, workers, Durability[name], directory) for name in durabilities]
+    return {'benchmark': 'end_to_end', 'transport': 'memory', 'results': results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Client -> Service throughput and dispatch lag over the in-memory broker')
+    parser.add_argument('--tasks', type=int, default=2000, help='tasks launched one by one')
+    parser.add_argument('--batch', type=int, default=100, help='tasks per launch_many batch')
+    parser.add_argument('--workers', type=int, default=10, help='service worker threads')
+    parser.add_argument('--durability', nargs='+', default=['GROUP'], choices=[d.name for d in Durability])
+    args = parser.parse_args()
+    dump(run(args.tasks, args.batch, args.workers, args.durability))
+
+
+if __name__ == '__main__':
+    main()
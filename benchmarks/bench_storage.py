@@ -0,0 +1,83 @@
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from _common import dump
+
+from schedulergodx.utils import DB, Durability, TaskStatus, WriteBuffer
+
+
+def _row(i: int, now: datetime) -> dict:
+    return {
+        'id': f'bench-{i:012}',
+        'client': 'bench',
+        'status': TaskStatus.WAITING,
+        'time_to_start': now,
+        'task': None,
+        'function_hash': 'bench',
+        'task_args': '[1, 2]',
+        'args_encoding': None,
+        'task_kwargs': '{}',
+        'lifetime': 3,
+        'hard': False
+    }
+
+
+def _parallel(threads: int, count: int, write) -> float:
+    def worker(offset: int) -> None:
+        for i in range(offset, count, threads):
+            write(i)
+    workers = [threading.Thread(target=worker, args=(offset,)) for offset in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - started
+
+
+def bench(path: str, durability: Durability, count: int, threads: int) -> dict:
+    db = DB(path, service_db=True)
+    writer = WriteBuffer(db, durability=durability)
+    writer.start()
+    now = datetime.now()
+    try:
+        inserted = _parallel(threads, count, lambda i: writer.insert([_row(i, now)]))
+        writer.flush()
+        updated = _parallel(threads, count, lambda i: writer.set_status(f'bench-{i:012}', TaskStatus.COMPLETED))
+        writer.flush()
+    finally:
+        writer.close()
+        db.engine.dispose()
+    return {
+        'durability': durability.name,
+        'rows': count,
+        'threads': threads,
+        'inserts_per_s': round(count / inserted),
+        'updates_per_s': round(count / updated),
+    }
+
+
+def run(count: int = 5000, threads: int = 8, durabilities: list[str] = ('SYNC', 'GROUP', 'ASYNC')) -> dict:
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name in durabilities:
+            path = f'sqlite:///{os.path.join(directory, f"{name.lower()}.db")}'
+            results.append(bench(path, Durability[name], count, threads))
+    return {'benchmark': 'storage', 'results': results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Task table write throughput per durability mode (SQLite)')
+    parser.add_argument('--rows', type=int, default=5000, help='rows inserted and updated per mode')
+    parser.add_argument('--threads', type=int, default=8, help='concurrent writers')
+    parser.add_argument('--durability', nargs='+', default=['SYNC', 'GROUP', 'ASYNC'], choices=[d.name for d in Durability])
+    args = parser.parse_args()
+    dump(run(args.rows, args.threads, args.durability))
+
+
+if __name__ == '__main__':
+    main()
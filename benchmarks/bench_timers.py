@@ -0,0 +1,61 @@
+import argparse
+import logging
+import threading
+import time
+from functools import partial
+from typing import Optional
+
+from _common import dump, percentiles
+
+from schedulergodx.service.scheduler import Scheduler
+
+
+def _fired(lateness: list[float], count: int, done: threading.Event, when: float) -> None:
+    lateness.append(time.time() - when)
+    if len(lateness) >= count:
+        done.set()
+
+
+def bench(count: int, window: float, lead: Optional[float] = None) -> dict:
+    if lead is None:
+        lead = 0.5 + count / 250_000
+    scheduler = Scheduler(logger=logging.getLogger('bench-timers'))
+    lateness: list[float] = []
+    done = threading.Event()
+    scheduler.start()
+    try:
+        pushed_at = time.perf_counter()
+        start = time.time() + lead
+        entries = []
+        for i in range(count):
+            when = start + window * i / count
+            entries.append((i, when, partial(_fired, lateness, count, done, when)))
+        scheduler.push_many(entries)
+        pushed = time.perf_counter() - pushed_at
+        completed = done.wait(window + lead + 60)
+    finally:
+        scheduler.stop()
+    return {
+        'timers': count,
+        'window_s': window,
+        'push_per_s': round(count / pushed),
+        'fired': len(lateness),
+        'completed': completed,
+        'lateness_ms': percentiles(lateness),
+    }
+
+
+def run(counts: list[int] = (10_000, 100_000), window: float = 5) -> dict:
+    return {'benchmark': 'timers', 'results': [bench(count, window) for count in counts]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Timer heap: push rate and firing accuracy of deferred tasks')
+    parser.add_argument('--counts', type=int, nargs='+', default=[10_000, 100_000], help='timers per run')
+    parser.add_argument('--window', type=float, default=5, help='seconds over which the timers are spread')
+    args = parser.parse_args()
+    dump(run(args.counts, args.window))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+import argparse
+import json
+import sys
+import time
+from contextlib import nullcontext
+
+import bench_codec
+import bench_end_to_end
+import bench_storage
+import bench_timers
+from _common import environment
+
+SIZES = {
+    'quick': {'codec': 500, 'timers': [10_000], 'storage': 1000, 'end_to_end': 500},
+    'default': {'codec': 2000, 'timers': [10_000, 100_000], 'storage': 5000, 'end_to_end': 2000},
+    'full': {'codec': 10_000, 'timers': [10_000, 100_000, 1_000_000], 'storage': 20_000, 'end_to_end': 10_000},
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Run the whole benchmark suite and write one JSON report')
+    parser.add_argument('--size', choices=SIZES, default='default', help='workload size')
+    parser.add_argument('--output', help='write the report to this file instead of stdout')
+    args = parser.parse_args()
+    sizes = SIZES[args.size]
+    started = time.time()
+    report = {
+        'environment': environment(),
+        'size': args.size,
+        'started_at': started,
+        'benchmarks': [
+            bench_codec.run(sizes['codec']),
+            bench_timers.run(sizes['timers']),
+            bench_storage.run(sizes['storage']),
+            bench_end_to_end.run(sizes['end_to_end'], durabilities=('SYNC', 'GROUP', 'ASYNC')),
+        ],
+    }
+    report['duration_s'] = round(time.time() - started, 3)
+    with open(args.output, 'w') if args.output else nullcontext(sys.stdout) as stream:
+        json.dump(report, stream, indent=2)
+        stream.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,8 @@
 
 __version__ = '1.0.0'
 
+from schedulergodx.client.async_core import AsyncClient
 from schedulergodx.client.core import Client
+from schedulergodx.client.results import TaskFailedError
+from schedulergodx.client.router import ResponseTimeoutError
 from schedulergodx.utils.rmq_property import RmqConnect
\ No newline at end of file
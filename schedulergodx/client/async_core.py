@@ -0,0 +1,280 @@
+import asyncio
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from functools import cached_property
+from logging import Logger
+from typing import Any, Callable, Generator, Iterable, Mapping, Optional
+
+import schedulergodx.utils as utils
+from schedulergodx.client.consumer import Consumer
+from schedulergodx.client.metrics import ClientMetrics
+from schedulergodx.client.publisher import Publisher
+from schedulergodx.client.results import (ResultCache, TaskFailedError,
+                                          load_result, result_missing)
+from schedulergodx.client.router import ResponseTimeoutError
+from schedulergodx.utils.logger import LoggerConstructor
+from schedulergodx.utils.metrics import MetricsRegistry
+
+
+class TaskResult:
+
+    def __init__(self, id: utils.MessageId, future: asyncio.Future, client: 'AsyncClient') -> None:
+        self.id = id
+        self._future = future
+        self._client = client
+
+    def __repr__(self) -> str:
+        return f'<TaskResult {self.id} ({"done" if self.done() else "pending"})>'
+
+    def __await__(self) -> Generator[Any, None, utils.MessageDisassemble]:
+        return self._future.__await__()
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    async def wait(self, timeout: Optional[float] = None) -> utils.MessageDisassemble:
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._future), timeout)
+        except asyncio.TimeoutError:
+            raise ResponseTimeoutError(f'no response to {self.id} within {timeout}s') from None
+
+    async def value(self, timeout: Optional[float] = None) -> Any:
+        return await self._client.get_result(self.id, timeout, response=await self.wait(timeout))
+
+
+class AsyncTask:
+
+    def __init__(self, func: Callable, client: 'AsyncClient',
+                 delay: Optional[utils.Seconds] = None, hard: bool = False) -> None:
+        self._func = func
+        self._client = client
+        self.task_lifetime = client.task_lifetime
+        self.hard_task_lifetime = client.hard_task_lifetime
+        self.delay = delay
+        self.hard = hard
+        self.function_hash: Optional[str] = None
+
+    def set_parameters(self, **kwargs) -> None:
+        self.__dict__.update(kwargs)
+
+    async def _register(self) -> str:
+        if self.function_hash is None:
+            self.function_hash = await self._client.register_function(self._func)
+        return self.function_hash
+
+    async def launch(self, *args, **kwargs) -> TaskResult:
+        started = time.perf_counter()
+        function_hash = await self._register()
+        id_ = next(self._client.id_generator)
+        result = TaskResult(id_, self._client.router.future(id_), self._client)
+        self._client.push(utils.MessageConstructor.task(
+            id = id_, client = self._client.name,
+            lifetime = self.hard_task_lifetime if self.hard else self.task_lifetime,
+            func = None, func_args = args, func_kwargs = kwargs,
+            delay = self.delay, hard = self.hard, function_hash = function_hash
+        ))
+        self._client.metrics.launches.inc()
+        self._client.metrics.launch.observe(time.perf_counter() - started)
+        self._client._logging('debug', 'launch-task has been sent (%s)', id_)
+        return result
+
+    async def launch_many(self, iterable_of_args: Iterable[Any], **kwargs) -> list[TaskResult]:
+        started = time.perf_counter()
+        function_hash = await self._register()
+        batch_id = next(self._client.id_generator)
+        tasks = [
+            (next(self._client.id_generator),
+             args if isinstance(args, tuple) else (args,), kwargs)
+            for args in iterable_of_args
+        ]
+        results = [TaskResult(task_id, self._client.router.future(task_id), self._client) for task_id, _, _ in tasks]
+        self._client.push(utils.MessageConstructor.task_batch(
+            id = batch_id, client = self._client.name,
+            lifetime = self.hard_task_lifetime if self.hard else self.task_lifetime,
+            func = None, tasks = tasks,
+            delay = self.delay, hard = self.hard, function_hash = function_hash
+        ))
+        self._client.metrics.launches.inc(len(tasks))
+        self._client.metrics.launch.observe(time.perf_counter() - started)
+        self._client._logging('debug', 'launch-batch has been sent (%s, %d tasks)', batch_id, len(tasks))
+        return results
+
+
+@dataclass
+class AsyncClient(utils.AbstractionCore):
+    name: str = 'client'
+    task_lifetime: int = 3
+    hard_task_lifetime: int = 10
+    enable_overdue: bool = False
+    init_timeout: Optional[utils.Seconds] = 30
+    codec: utils.Codec = utils.JSON_CODEC
+    result_cache_size: int = 1024
+    result_poll_interval: utils.Seconds = 30
+    metrics_port: Optional[int] = None
+    metrics_host: str = '127.0.0.1'
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.rmq_connect, utils.Transport):
+            raise TypeError(f'rmq_connect must be a utils.Transport, not {type(self.rmq_connect).__name__}')
+        self.publisher = Publisher('publisher', rmq_que=self.rmq_publisher_que, 
+                                   logger=self.logger, rmq_connect=self.rmq_connect)
+        self.consumer = Consumer('consumer', client=self.name, rmq_que=self.rmq_consumer_que, 
+                                 logger=self.logger, rmq_connect=self.rmq_connect)
+        self.router = self.consumer.router
+        self._functions: set[str] = set()
+        self._results = ResultCache(self.result_cache_size)
+        self.metrics = ClientMetrics(MetricsRegistry('schedulergodx_client'))
+        if self.metrics_port is not None:
+            self.metrics.registry.serve(self.metrics_port, self.metrics_host)
+
+    async def __aenter__(self) -> 'AsyncClient':
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    def rmq_publisher_que(self) -> str:
+        return 'client-service'
+
+    @property
+    def rmq_consumer_que(self) -> str:
+        return f'service-client.{self.name}'
+
+    @cached_property
+    def logger(self) -> Logger:
+        return LoggerConstructor(name=self.name).getLogger()
+
+    async def connect(self) -> None:
+        self.consumer.start_consuming()
+        id_ = next(self.id_generator)
+        self.push(data=utils.MessageConstructor.initialization(
+            id = id_, client = self.name,
+            enable_overdue = self.enable_overdue
+        ))
+        responce = await self.async_get_response(id_, timeout=self.init_timeout)
+        if responce.metadata['type'] == utils.Message.ERROR:
+            error = f'{responce.arguments["error_code"]} - {responce.arguments["message"]}'
+            self._logging('fatal', error)
+            raise Exception(error)
+        elif responce.arguments['responce'] == utils.MessageInfoStatus.OK.value:
+            self._logging('info', 'successful initialization')
+        else:
+            raise Exception(responce)
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        await asyncio.to_thread(self._close, timeout)
+
+    def _close(self, timeout: Optional[float]) -> None:
+        self.publisher.close(timeout)
+        self.consumer.stop_consuming()
+
+    def task(self, func: Callable) -> AsyncTask:
+        return AsyncTask(func, self)
+
+    async def register_function(self, func: Callable) -> str:
+        body = utils.MessageConstructor.dumps(func)
+        function_hash = utils.MessageConstructor.function_hash(body)
+        if function_hash in self._functions:
+            return function_hash
+        id_ = next(self.id_generator)
+        self.push(data=utils.MessageConstructor.function(id=id_, client=self.name, hash=function_hash))
+        responce = await self.async_get_response(id_, timeout=self.init_timeout)
+        if (responce.metadata['type'] == utils.Message.ERROR
+            and responce.arguments['error_code'] == utils.MessageErrorStatus.UNKNOWN_FUNCTION.value):
+            id_ = next(self.id_generator)
+            self.push(data=utils.MessageConstructor.function(
+                id = id_, client = self.name,
+                hash = function_hash, function = body
+            ))
+            responce = await self.async_get_response(id_, timeout=self.init_timeout)
+        if responce.metadata['type'] == utils.Message.ERROR:
+            error = f'{responce.arguments["error_code"]} - {responce.arguments["message"]}'
+            self._logging('error', f'function registration failed: {error}')
+            raise Exception(error)
+        self._functions.add(function_hash)
+        self._logging('info', f'function {function_hash} has been registered')
+        return function_hash
+
+    def push(self, data: Mapping, **kwargs) -> Future:
+        kwargs.setdefault('codec', self.codec)
+        future = self.publisher.publish(data, **kwargs)
+        self._logging('debug', 'A message (%s) has been queued to %s', data.get('id'), self.publisher.name)
+        return future
+
+    def get_response(self, message_id: utils.MessageId) -> utils.MessageDisassemble | None:
+        return self.router.get(message_id)
+
+    async def async_get_response(self, message_id: utils.MessageId,
+                                 timeout: Optional[float] = None) -> utils.MessageDisassemble:
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(self.router.future(message_id), timeout)
+        except asyncio.TimeoutError:
+            self.metrics.response_timeouts.inc()
+            raise ResponseTimeoutError(f'no response to {message_id} within {timeout}s') from None
+        finally:
+            self.metrics.response_wait.observe(time.perf_counter() - started)
+        self._logging('debug', 'response received (async_get_response): %s', message_id)
+        return response
+
+    def _poll_timeout(self, deadline: Optional[float], minimum: float) -> float:
+        if deadline is None:
+            return self.result_poll_interval
+        return min(self.result_poll_interval, max(deadline - time.monotonic(), minimum))
+
+    async def _await_result(self, task_id: utils.MessageId,
+                            timeout: Optional[float] = None) -> utils.MessageDisassemble:
+        started = time.perf_counter()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._poll_timeout(deadline, 0)
+            try:
+                response = await asyncio.wait_for(self.router.future(task_id), wait)
+            except asyncio.TimeoutError:
+                response = await self._lookup_result(task_id, self._poll_timeout(deadline, 1))
+            if response is not None:
+                self.metrics.response_wait.observe(time.perf_counter() - started)
+                return response
+            if deadline is not None and time.monotonic() >= deadline:
+                self.metrics.response_timeouts.inc()
+                raise ResponseTimeoutError(f'no response to {task_id} within {timeout}s')
+
+    async def _lookup_result(self, task_id: utils.MessageId, timeout: float) -> utils.MessageDisassemble | None:
+        id_ = next(self.id_generator)
+        self.push(data=utils.MessageConstructor.result(id=id_, client=self.name, task_id=task_id))
+        try:
+            response = await asyncio.wait_for(self.router.future(id_), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if result_missing(response):
+            return None
+        self._logging('debug', 'the result of %s was looked up in the service', task_id)
+        return response
+
+    async def get_result(self, task_id: utils.MessageId, timeout: Optional[float] = None,
+                         response: Optional[utils.MessageDisassemble] = None) -> Any:
+        try:
+            return self._results.get(task_id)
+        except KeyError:
+            pass
+        if response is None:
+            response = await self._await_result(task_id, timeout)
+        try:
+            stored, result = load_result(response)
+        except TaskFailedError as e:
+            self._results.fail(task_id, e)
+            raise
+        if stored:
+            return await self.fetch_result(task_id, timeout)
+        self._results.put(task_id, result)
+        return result
+
+    async def fetch_result(self, task_id: utils.MessageId, timeout: Optional[float] = None) -> Any:
+        id_ = next(self.id_generator)
+        self.push(data=utils.MessageConstructor.result(id=id_, client=self.name, task_id=task_id))
+        _, result = load_result(await self.async_get_response(id_, timeout))
+        self._results.put(task_id, result)
+        return result
@@ -1,20 +1,83 @@
+import threading
+from functools import partial
+from logging import Logger
+from typing import Optional
+
+from pika.exceptions import AMQPChannelError, AMQPConnectionError
+
 import schedulergodx.utils as utils
+from schedulergodx.client.router import ResponseRouter
 
 
 class Consumer(utils.AbstractionConnectClass):
-    
+
+    def __init__(self, name: str, *, client: str, rmq_que: str, logger: Logger,
+                 rmq_connect: utils.Transport) -> None:
+        super().__init__(name, rmq_que=rmq_que, logger=logger, rmq_connect=rmq_connect)
+        self.client = client
+        self.router = ResponseRouter()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+
+    def start_consuming(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._consume, name=f'{self.client}-{self.name}', daemon=True)
+        self._thread.start()
+
+    def _consume(self) -> None:
+        while not self._stopping:
+            try:
+                channel = self.channel
+            except (AMQPConnectionError, AMQPChannelError) as e:
+                self._channel = None
+                self._logging('error', f'could not open a channel, reconnecting: {e}')
+                continue
+            closed = threading.Event()
+            self.rmq_connect.call_soon(partial(self._subscribe, channel, closed))
+            closed.wait()
+            self._channel = None
+            if not self._stopping:
+                self._logging('error', f'the channel to queue "{self.queue}" was closed, reconnecting')
+                
+    def _subscribe(self, channel, closed: threading.Event) -> None:
+        if channel.is_open and self._stopping:
+            channel.close()
+        if not channel.is_open or self._stopping:
+            return closed.set()
+        channel.add_on_close_callback(lambda channel, reason: closed.set())
+        channel.basic_consume(self.queue, self._on_message)
+        self._logging('info', f'started consuming queue "{self.queue}"')
+        
+    def _close_channel(self) -> None:
+        channel = self._channel
+        if channel is not None and channel.is_open:
+            channel.close()
+
+    def stop_consuming(self) -> None:
+        if self._thread is None:
+            return
+        self._stopping = True
+        self.rmq_connect.call_soon(self._close_channel)
+        self._thread.join()
+        self._thread = None
+        self._logging('info', f'stopped consuming queue "{self.queue}"')
+
+    def _on_message(self, channel, method_frame, header_frame, body) -> None:
+        try:
+            message = utils.MessageConstructor.disassemble(body, header_frame.content_type)
+        except (KeyError, ValueError):
+            channel.basic_ack(delivery_tag=method_frame.delivery_tag)
+            return self._logging('error', 'a message with an incorrect format was received')
+        channel.basic_ack(delivery_tag=method_frame.delivery_tag)
+        if message.metadata['client'] != self.client:
+            return self._logging('error', f'a response for client {message.metadata["client"]} was dropped')
+        self.router.dispatch(message)
+
     def get_response(self, message_id: utils.MessageId) -> utils.MessageDisassemble | None:
-        self.channel.tx_select()
-        while True:
-            method_frame, header_frame, body = self.channel.basic_get(queue=self.queue, auto_ack=False)
-            if method_frame:
-                message = utils.MessageConstructor.disassemble(body)
-                if message.metadata['id'] == message_id:
-                    self.channel.basic_ack(delivery_tag=method_frame.delivery_tag)
-                    return message
-                else:
-                    self.channel.basic_nack(delivery_tag=method_frame.delivery_tag, requeue=True)
-            else:
-                break
-        self.channel.tx_commit()
-        return None
\ No newline at end of file
+        return self.router.get(message_id)
+
+    def wait_response(self, message_id: utils.MessageId,
+                      timeout: Optional[float] = None) -> utils.MessageDisassemble | None:
+        return self.router.wait(message_id, timeout)
@@ -1,22 +1,26 @@
 import asyncio
 import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
 from dataclasses import dataclass
-from datetime import datetime
 from functools import cached_property
 from logging import Logger
-from typing import (Any, Callable, Iterable, Mapping, MutableMapping, Optional,
-                    TypeAlias)
+from typing import Any, Callable, Iterable, Mapping, Optional
 
 import schedulergodx.utils as utils
 from schedulergodx.client.consumer import Consumer
+from schedulergodx.client.handles import HandleMap, TaskHandle
+from schedulergodx.client.metrics import ClientMetrics
 from schedulergodx.client.publisher import Publisher
+from schedulergodx.client.results import (ResultCache, TaskFailedError,
+                                          load_result, result_missing)
+from schedulergodx.client.router import ResponseTimeoutError
 from schedulergodx.utils.logger import LoggerConstructor
+from schedulergodx.utils.metrics import MetricsRegistry
+
+Batch = namedtuple('Batch', 'id ids')
 
-ThreadMap: TypeAlias = (
-    MutableMapping[
-        str, threading.Thread
-            ]
-)
 
 @dataclass
 class Client(utils.AbstractionCore):
@@ -24,19 +28,53 @@ class Client(utils.AbstractionCore):
     task_lifetime: int = 3
     hard_task_lifetime: int = 10
     enable_overdue: bool = False
+    init_timeout: Optional[utils.Seconds] = 30
+    codec: utils.Codec = utils.JSON_CODEC
+    result_cache_size: int = 1024
+    result_poll_interval: utils.Seconds = 30
+    max_handles: int = 10000
+    lazy: bool = False
+    metrics_port: Optional[int] = None
+    metrics_host: str = '127.0.0.1'
     
     def __post_init__(self) -> None:
         self.publisher = Publisher('publisher', rmq_que=self.rmq_publisher_que, 
                                    logger=self.logger, rmq_connect=self.rmq_connect)
-        self.consumer = Consumer('consumer', rmq_que=self.rmq_consumer_que, 
+        self.consumer = Consumer('consumer', client=self.name, rmq_que=self.rmq_consumer_que, 
                                  logger=self.logger, rmq_connect=self.rmq_connect)
-        self._thread_map: ThreadMap = {}
+        self._handles = HandleMap(self.max_handles)
+        self._functions: set[str] = set()
+        self._results = ResultCache(self.result_cache_size)
+        self._connect_lock = threading.Lock()
+        self._connected = False
+        self.metrics = ClientMetrics(MetricsRegistry('schedulergodx_client'))
+        if self.metrics_port is not None:
+            self.metrics.registry.serve(self.metrics_port, self.metrics_host)
+        if not self.lazy:
+            self.connect()
+            
+    def connect(self) -> None:
+        if self._connected:
+            return
+        with self._connect_lock:
+            if self._connected:
+                return
+            self._initialize()
+            self._connected = True
+        
+    def _initialize(self) -> None:
+        self.consumer.start_consuming()
         id_ = next(self.id_generator)
-        self.push(data=utils.MessageConstructor.initialization(
+        self._push(data=utils.MessageConstructor.initialization(
             id = id_, client = self.name,
             enable_overdue = self.enable_overdue
         ))
-        responce = self.sync_await_responce(id_)
+        try:
+            responce = self.sync_await_responce(id_, timeout=self.init_timeout)
+        except ResponseTimeoutError as e:
+            self._logging('fatal', f'initialization failed: {e}')
+            self.consumer.stop_consuming()
+            raise
         if responce.metadata['type'] == utils.Message.ERROR:
             error = f'{responce.arguments["error_code"]} - {responce.arguments["message"]}'
             self._logging('fatal', error)
@@ -52,27 +90,17 @@ class Client(utils.AbstractionCore):
     
     @property
     def rmq_consumer_que(self) -> str:
-       return 'service-client'
+       return f'service-client.{self.name}'
    
     @cached_property
     def logger(self) -> Logger:
        return LoggerConstructor(name=self.name).getLogger()
     
-    def _new_thread(self, target: Callable, key: str, thread_hint: Optional[str] = None, 
-                    thread_args: Iterable[Any] = (), thread_kwargs: Mapping[str, Any] | None = None) -> None:
-        thread = threading.Thread(target=target, args=thread_args, kwargs=thread_kwargs)
-        self._thread_map[key] = thread
-        thread.start()
-        self._logging('info', f'thread {key} {("("+thread_hint+")") if thread_hint else ""} has started')
-        
-    def get_threads(self) -> ThreadMap:
-        return self._thread_map
+    def get_handles(self) -> list[TaskHandle]:
+        return self._handles.values()
     
-    def get_thread(self, id: str) -> threading.Thread | None:
-        threads = self._thread_map.keys()
-        for thread in threads:
-            if f'{id}_' in thread:
-                return self._thread_map[thread]
+    def get_handle(self, id: utils.MessageId) -> TaskHandle | None:
+        return self._handles.get(id)
     
     def task(self, func: Callable):
         class Task:
@@ -84,48 +112,168 @@ class Client(utils.AbstractionCore):
                 self.hard_task_lifetime = client.hard_task_lifetime
                 self.delay = delay
                 self.hard = hard
+                self._function_hash: Optional[str] = None
+                
+            @property
+            def function_hash(self) -> str:
+                if self._function_hash is None:
+                    self._function_hash = self._client.register_function(self._func)
+                return self._function_hash
                 
             def set_parameters(self, **kwargs) -> None:
                 self.__dict__.update(kwargs)
                 
             def launch(self, *args, **kwargs) -> utils.MessageId:
+                started = time.perf_counter()
                 id_ = next(self._client.id_generator)
-                self._client._logging('info', f'launch-task has been created ({id_})')
-                self._client._new_thread(
-                    target = self._client.push, 
-                    thread_hint = self.launch.__name__, 
-                    key = f'{id_}_{datetime.now()}', 
-                    thread_kwargs = {
-                        'data': utils.MessageConstructor.task(
-                            id = id_, client = self._client.name,
-                            lifetime = self.hard_task_lifetime if self.hard else self.task_lifetime,  
-                            func = self._func, func_args = args, func_kwargs = kwargs,
-                            delay = self.delay, hard = self.hard)}
-                    )
-                self._client._logging('info', f'launch-task has been created ({id_})')
+                self._client._track(id_, self._client.push(data=utils.MessageConstructor.task(
+                    id = id_, client = self._client.name,
+                    lifetime = self.hard_task_lifetime if self.hard else self.task_lifetime,  
+                    func = None, func_args = args, func_kwargs = kwargs,
+                    delay = self.delay, hard = self.hard,
+                    function_hash = self.function_hash
+                )))
+                self._client.metrics.launches.inc()
+                self._client.metrics.launch.observe(time.perf_counter() - started)
+                self._client._logging('debug', 'launch-task has been created (%s)', id_)
                 return id_
+            
+            def launch_many(self, iterable_of_args: Iterable[Any], **kwargs) -> Batch:
+                started = time.perf_counter()
+                batch_id = next(self._client.id_generator)
+                tasks = [
+                    (next(self._client.id_generator), 
+                     args if isinstance(args, tuple) else (args,), kwargs)
+                    for args in iterable_of_args
+                ]
+                self._client._track(batch_id, self._client.push(data=utils.MessageConstructor.task_batch(
+                    id = batch_id, client = self._client.name,
+                    lifetime = self.hard_task_lifetime if self.hard else self.task_lifetime,  
+                    func = None, tasks = tasks,
+                    delay = self.delay, hard = self.hard,
+                    function_hash = self.function_hash
+                )))
+                self._client.metrics.launches.inc(len(tasks))
+                self._client.metrics.launch.observe(time.perf_counter() - started)
+                self._client._logging('debug', 'launch-batch has been created (%s, %d tasks)', batch_id, len(tasks))
+                return Batch(batch_id, [task_id for task_id, _, _ in tasks])
                             
         return Task(func, self)
+    
+    def register_function(self, func: Callable) -> str:
+        body = utils.MessageConstructor.dumps(func)
+        function_hash = utils.MessageConstructor.function_hash(body)
+        if function_hash in self._functions:
+            return function_hash
+        id_ = next(self.id_generator)
+        self.push(data=utils.MessageConstructor.function(id=id_, client=self.name, hash=function_hash))
+        responce = self.sync_await_responce(id_, timeout=self.init_timeout)
+        if (responce.metadata['type'] == utils.Message.ERROR 
+            and responce.arguments['error_code'] == utils.MessageErrorStatus.UNKNOWN_FUNCTION.value):
+            id_ = next(self.id_generator)
+            self.push(data=utils.MessageConstructor.function(
+                id = id_, client = self.name,
+                hash = function_hash, function = body
+            ))
+            responce = self.sync_await_responce(id_, timeout=self.init_timeout)
+        if responce.metadata['type'] == utils.Message.ERROR:
+            error = f'{responce.arguments["error_code"]} - {responce.arguments["message"]}'
+            self._logging('error', f'function registration failed: {error}')
+            raise Exception(error)
+        self._functions.add(function_hash)
+        self._logging('info', f'function {function_hash} has been registered')
+        return function_hash
            
-    def push(self, data: Mapping, **kwargs) -> None:
-        self.publisher.publish(data, **kwargs)
-        self._logging('debug', f'A message ({data.get("id")}) has been sent to {self.publisher.name}')
+    def push(self, data: Mapping, **kwargs) -> Future:
+        self.connect()
+        return self._push(data, **kwargs)
+        
+    def _push(self, data: Mapping, **kwargs) -> Future:
+        kwargs.setdefault('codec', self.codec)
+        future = self.publisher.publish(data, **kwargs)
+        self._logging('debug', 'A message (%s) has been queued to %s', data.get('id'), self.publisher.name)
+        return future
+    
+    def _track(self, id: utils.MessageId, future: Future) -> TaskHandle:
+        return self._handles.track(id, future)
+    
+    def flush(self, timeout: Optional[float] = None) -> None:
+        self.publisher.flush(timeout)
         
     def get_response(self, message_id: utils.MessageId) -> utils.MessageDisassemble | None:
         return self.consumer.get_response(message_id)
     
-    def sync_await_responce(self, message_id: utils.MessageId) -> utils.MessageDisassemble:
+    def sync_await_responce(self, message_id: utils.MessageId, 
+                            timeout: Optional[float] = None) -> utils.MessageDisassemble:
+        started = time.perf_counter()
+        responce = self.consumer.wait_response(message_id, timeout)
+        self.metrics.response_wait.observe(time.perf_counter() - started)
+        if responce is None:
+            self.metrics.response_timeouts.inc()
+            raise ResponseTimeoutError(f'no response to {message_id} within {timeout}s')
+        self._logging('debug', 'response received (sync_await_response): %s', message_id)
+        return responce
+    
+    def _poll_timeout(self, deadline: Optional[float], minimum: float) -> float:
+        if deadline is None:
+            return self.result_poll_interval
+        return min(self.result_poll_interval, max(deadline - time.monotonic(), minimum))
+    
+    def _await_result(self, task_id: utils.MessageId, 
+                      timeout: Optional[float] = None) -> utils.MessageDisassemble:
+        started = time.perf_counter()
+        deadline = None if timeout is None else time.monotonic() + timeout
         while True:
-            responce = self.get_response(message_id)
-            if responce: 
-                self._logging('info', f'response received (sync_await_response): {message_id}')
+            wait = self._poll_timeout(deadline, 0)
+            responce = (self.consumer.wait_response(task_id, wait) 
+                        or self._lookup_result(task_id, self._poll_timeout(deadline, 1)))
+            if responce is not None:
+                self.metrics.response_wait.observe(time.perf_counter() - started)
                 return responce
+            if deadline is not None and time.monotonic() >= deadline:
+                self.metrics.response_timeouts.inc()
+                raise ResponseTimeoutError(f'no response to {task_id} within {timeout}s')
+    
+    def _lookup_result(self, task_id: utils.MessageId, timeout: float) -> utils.MessageDisassemble | None:
+        id_ = next(self.id_generator)
+        self.push(data=utils.MessageConstructor.result(id=id_, client=self.name, task_id=task_id))
+        responce = self.consumer.wait_response(id_, timeout)
+        if responce is None or result_missing(responce):
+            return None
+        self._logging('debug', 'the result of %s was looked up in the service', task_id)
+        return responce
+    
+    def get_result(self, task_id: utils.MessageId, timeout: Optional[float] = None) -> Any:
+        try:
+            return self._results.get(task_id)
+        except KeyError:
+            pass
+        try:
+            stored, result = load_result(self._await_result(task_id, timeout))
+        except TaskFailedError as e:
+            self._results.fail(task_id, e)
+            raise
+        if stored:
+            return self.fetch_result(task_id, timeout)
+        self._results.put(task_id, result)
+        return result
+    
+    def fetch_result(self, task_id: utils.MessageId, timeout: Optional[float] = None) -> Any:
+        id_ = next(self.id_generator)
+        self.push(data=utils.MessageConstructor.result(id=id_, client=self.name, task_id=task_id))
+        _, result = load_result(self.sync_await_responce(id_, timeout))
+        self._results.put(task_id, result)
+        return result
     
     async def async_get_response(self, message_id: utils.MessageId, 
-                                 heartbeat: float = 0.2) -> utils.MessageDisassemble:
-        while True:
-            response = self.get_response(message_id)
-            if response: 
-                self._logging('info', f'response received (async_get_response): {message_id}')
-                return response
-            await asyncio.sleep(heartbeat) 
\ No newline at end of file
+                                 timeout: Optional[float] = None) -> utils.MessageDisassemble:
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(self.consumer.router.future(message_id), timeout)
+        except asyncio.TimeoutError:
+            self.metrics.response_timeouts.inc()
+            raise ResponseTimeoutError(f'no response to {message_id} within {timeout}s') from None
+        finally:
+            self.metrics.response_wait.observe(time.perf_counter() - started)
+        self._logging('debug', 'response received (async_get_response): %s', message_id)
+        return response
\ No newline at end of file
@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from enum import Enum
+from typing import Optional
+
+import schedulergodx.utils as utils
+
+
+class TaskState(Enum):
+    QUEUED = 'queued'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+
+class TaskHandle:
+    __slots__ = ('id', 'state', 'sent_at', 'acked_at', 'error')
+
+    def __init__(self, id: utils.MessageId) -> None:
+        self.id = id
+        self.state = TaskState.QUEUED
+        self.sent_at = time.time()
+        self.acked_at: Optional[float] = None
+        self.error: Optional[BaseException] = None
+
+    def __repr__(self) -> str:
+        return f'<TaskHandle {self.id} ({self.state.value})>'
+
+    def done(self) -> bool:
+        return self.state is not TaskState.QUEUED
+
+    def _on_publish(self, future: Future) -> None:
+        self.acked_at = time.time()
+        self.error = future.exception()
+        self.state = TaskState.SENT if self.error is None else TaskState.FAILED
+
+
+class HandleMap:
+
+    def __init__(self, size: int = 10000) -> None:
+        self.size = size
+        self._lock = threading.Lock()
+        self._handles: OrderedDict[utils.MessageId, TaskHandle] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f'<HandleMap (size: {self.size}, tracked: {len(self._handles)})>'
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def __contains__(self, id: utils.MessageId) -> bool:
+        return id in self._handles
+
+    def track(self, id: utils.MessageId, future: Future) -> TaskHandle:
+        handle = TaskHandle(id)
+        if self.size:
+            with self._lock:
+                self._handles[id] = handle
+                while len(self._handles) > self.size:
+                    self._handles.popitem(last=False)
+        future.add_done_callback(handle._on_publish)
+        return handle
+
+    def get(self, id: utils.MessageId) -> TaskHandle | None:
+        return self._handles.get(id)
+
+    def values(self) -> list[TaskHandle]:
+        with self._lock:
+            return list(self._handles.values())
+
+    def prune(self) -> int:
+        with self._lock:
+            finished = [id for id, handle in self._handles.items() if handle.done()]
+            for id in finished:
+                del self._handles[id]
+        return len(finished)
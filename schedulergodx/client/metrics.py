@@ -0,0 +1,14 @@
+from schedulergodx.utils.metrics import MetricsRegistry
+
+
+class ClientMetrics:
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.registry = registry
+        self.launches = registry.counter('launches', 'tasks launched')
+        self.launch = registry.histogram('launch_seconds', 'time spent in launch() and launch_many()')
+        self.response_wait = registry.histogram('response_wait_seconds', 'time spent waiting for a response')
+        self.response_timeouts = registry.counter('response_timeouts', 'responses that were not received in time')
+
+    def __repr__(self) -> str:
+        return f'<ClientMetrics ({self.registry})>'
@@ -0,0 +1,66 @@
+import threading
+from collections import OrderedDict
+from typing import Any
+
+import schedulergodx.utils as utils
+
+
+class TaskFailedError(Exception):
+    pass
+
+
+class _Failure:
+    __slots__ = ('message',)
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+
+class ResultCache:
+
+    def __init__(self, size: int = 1024) -> None:
+        self.size = size
+        self._lock = threading.Lock()
+        self._results: OrderedDict[utils.MessageId, Any] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f'<ResultCache (size: {self.size}, cached: {len(self._results)})>'
+
+    def __contains__(self, task_id: utils.MessageId) -> bool:
+        return task_id in self._results
+
+    def get(self, task_id: utils.MessageId) -> Any:
+        with self._lock:
+            self._results.move_to_end(task_id)
+            result = self._results[task_id]
+        if isinstance(result, _Failure):
+            raise TaskFailedError(result.message)
+        return result
+
+    def put(self, task_id: utils.MessageId, result: Any) -> None:
+        if not self.size:
+            return
+        with self._lock:
+            self._results[task_id] = result
+            self._results.move_to_end(task_id)
+            if len(self._results) > self.size:
+                self._results.popitem(last=False)
+
+    def fail(self, task_id: utils.MessageId, error: TaskFailedError) -> None:
+        self.put(task_id, _Failure(str(error)))
+
+
+def load_result(response: utils.MessageDisassemble) -> tuple[bool, Any]:
+    if response.metadata['type'] == utils.Message.ERROR:
+        raise TaskFailedError(f'{response.arguments["error_code"]} - {response.arguments["message"]}')
+    arguments = response.arguments
+    if 'result_error' in arguments:
+        raise TaskFailedError(arguments['result_error'])
+    if 'result' in arguments:
+        return False, utils.MessageConstructor.decode_result(arguments['result_encoding'], arguments['result'])
+    return bool(arguments.get('result_stored')), None
+
+
+def result_missing(response: utils.MessageDisassemble) -> bool:
+    return (response.metadata['type'] == utils.Message.ERROR
+            and response.arguments['error_code'] == utils.MessageErrorStatus.RESULT_NOT_FOUND.value)
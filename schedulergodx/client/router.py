@@ -0,0 +1,100 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import schedulergodx.utils as utils
+
+
+class ResponseTimeoutError(TimeoutError):
+    pass
+
+
+class _Waiter:
+    __slots__ = ('event', 'message', 'futures', 'users')
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.message: utils.MessageDisassemble | None = None
+        self.futures: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self.users = 0
+
+    def set(self, message: utils.MessageDisassemble) -> None:
+        self.message = message
+        self.event.set()
+        for loop, future in self.futures:
+            loop.call_soon_threadsafe(_set_future, future, message)
+
+
+def _set_future(future: asyncio.Future, message: utils.MessageDisassemble) -> None:
+    if not future.done():
+        future.set_result(message)
+
+
+class ResponseRouter:
+
+    def __init__(self, max_unclaimed: int = 10000) -> None:
+        self.max_unclaimed = max_unclaimed
+        self._lock = threading.Lock()
+        self._waiters: dict[utils.MessageId, _Waiter] = {}
+        self._unclaimed: OrderedDict[utils.MessageId, utils.MessageDisassemble] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f'<ResponseRouter (waiting: {len(self._waiters)}, unclaimed: {len(self._unclaimed)})>'
+
+    def dispatch(self, message: utils.MessageDisassemble) -> None:
+        message_id = message.metadata['id']
+        with self._lock:
+            waiter = self._waiters.pop(message_id, None)
+            if waiter is None:
+                self._unclaimed[message_id] = message
+                if len(self._unclaimed) > self.max_unclaimed:
+                    self._unclaimed.popitem(last=False)
+                return
+        waiter.set(message)
+
+    def get(self, message_id: utils.MessageId) -> utils.MessageDisassemble | None:
+        with self._lock:
+            return self._unclaimed.pop(message_id, None)
+
+    def _register(self, message_id: utils.MessageId) -> _Waiter | utils.MessageDisassemble:
+        message = self._unclaimed.pop(message_id, None)
+        if message is not None:
+            return message
+        waiter = self._waiters.get(message_id)
+        if waiter is None:
+            waiter = self._waiters[message_id] = _Waiter()
+        waiter.users += 1
+        return waiter
+
+    def _release(self, message_id: utils.MessageId, waiter: _Waiter) -> None:
+        with self._lock:
+            waiter.users -= 1
+            if not waiter.users and self._waiters.get(message_id) is waiter:
+                del self._waiters[message_id]
+
+    def wait(self, message_id: utils.MessageId,
+             timeout: Optional[float] = None) -> utils.MessageDisassemble | None:
+        with self._lock:
+            waiter = self._register(message_id)
+        if not isinstance(waiter, _Waiter):
+            return waiter
+        if not waiter.event.wait(timeout):
+            self._release(message_id, waiter)
+        return waiter.message
+
+    def future(self, message_id: utils.MessageId,
+               loop: asyncio.AbstractEventLoop | None = None) -> asyncio.Future:
+        loop = loop or asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            waiter = self._register(message_id)
+            if isinstance(waiter, _Waiter):
+                waiter.futures.append((loop, future))
+        if not isinstance(waiter, _Waiter):
+            future.set_result(waiter)
+        else:
+            future.add_done_callback(
+                lambda f: f.cancelled() and self._release(message_id, waiter)
+                )
+        return future
@@ -2,4 +2,6 @@
 __version__ = '1.0.0'
 
 from schedulergodx.service.core import Service
+from schedulergodx.service.pool import BackpressurePolicy
+from schedulergodx.service.retention import ArchiveMode
 from schedulergodx.utils.rmq_property import RmqConnect
\ No newline at end of file
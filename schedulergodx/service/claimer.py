@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from logging import Logger
+from typing import Any, Callable
+
+from schedulergodx.utils.logger import LoggerConstructor
+from schedulergodx.utils.storage import DB, WriteBuffer
+
+
+class Claimer:
+
+    def __init__(self, db: DB, writer: WriteBuffer, owner: str, lease: timedelta, logger: Logger,
+                 on_claimed: Callable[[DB.Task], Any], on_missed: Callable[[str], Any],
+                 batch_size: int = 100, retry_delay: float = 1, name: str = 'claimer') -> None:
+        self.name = name
+        self.logger = logger
+        self.db = db
+        self.writer = writer
+        self.owner = owner
+        self.lease = lease
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self._on_claimed = on_claimed
+        self._on_missed = on_missed
+        self._pending: deque[str] = deque()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    def __repr__(self) -> str:
+        return f'<Claimer (owner: {self.owner}, pending: {len(self._pending)})>'
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _logging(self, level: str, message: str, *args) -> None:
+        LoggerConstructor.log(self.logger, level, f'{self.name} - {message}', *args)
+
+    def add(self, task_id: str) -> None:
+        with self._condition:
+            self._pending.append(task_id)
+            if len(self._pending) == 1:
+                self._condition.notify()
+
+    def _take(self) -> list[str] | None:
+        with self._condition:
+            while self._running and not self._pending:
+                self._condition.wait()
+            if not self._running:
+                return None
+            return [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+
+    def _claim(self, ids: list[str]) -> list[DB.Task]:
+        with self.db.session() as db_session:
+            tasks = self.db.claim_tasks(db_session, owner=self.owner, lease=self.lease, ids=ids, limit=len(ids))
+            if len(tasks) < len(ids):
+                self.writer.flush()
+                claimed = {task.id for task in tasks}
+                missed = [id for id in ids if id not in claimed]
+                tasks += self.db.claim_tasks(db_session, owner=self.owner, lease=self.lease,
+                                             ids=missed, limit=len(missed))
+        return tasks
+
+    def _run(self) -> None:
+        while True:
+            ids = self._take()
+            if ids is None:
+                return
+            try:
+                tasks = self._claim(ids)
+            except Exception as e:
+                self._logging('error', f'{len(ids)} tasks were not claimed, retrying: {e}')
+                with self._condition:
+                    self._pending.extendleft(reversed(ids))
+                time.sleep(self.retry_delay)
+                continue
+            claimed = {task.id for task in tasks}
+            for callback, arguments in ((self._on_claimed, tasks), 
+                                        (self._on_missed, [id for id in ids if id not in claimed])):
+                for argument in arguments:
+                    try:
+                        callback(argument)
+                    except Exception as e:
+                        self._logging('error', f'dispatch failed: {e}')
+
+    def start(self) -> None:
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -1,10 +1,140 @@
-from typing import Callable, NoReturn
+import threading
+from collections import namedtuple
+from functools import partial
+from logging import Logger
+from typing import Any, Callable, Optional
+
+from pika.exceptions import AMQPChannelError, AMQPConnectionError
 
 import schedulergodx.utils as utils
 
+Delivery = namedtuple('Delivery', 'generation tag')
+
 
 class Consumer(utils.AbstractionConnectClass):
-    
-    def start_consuming(self, on_message: Callable) -> NoReturn: 
-        self.channel.basic_consume(self.queue, on_message)
-        self.channel.start_consuming()
\ No newline at end of file
+
+    def __init__(self, name: str, *, rmq_que: str, logger: Logger, rmq_connect: utils.Transport,
+                 prefetch_count: int = 1000) -> None:
+        super().__init__(name, rmq_que=rmq_que, logger=logger, rmq_connect=rmq_connect)
+        self.prefetch_count = prefetch_count
+        self._lock = threading.Lock()
+        self._inflight: dict[int, bool] = {}
+        self._ack_tag = 0
+        self._acked_tag = 0
+        self._nacks: list[int] = []
+        self._ack_scheduled = False
+        self._generation = 0
+        self._stopping = False
+        self._consumer_tag: Optional[str] = None
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+
+    def start_consuming(self, on_message: Callable, before_close: Optional[Callable[[], Any]] = None) -> None:
+        self._idle.clear()
+        try:
+            while not self._stopping:
+                try:
+                    channel = self.channel
+                except (AMQPConnectionError, AMQPChannelError) as e:
+                    self._channel = None
+                    self._logging('error', f'could not open a channel, reconnecting: {e}')
+                    continue
+                with self._lock:
+                    self._generation += 1
+                    self._inflight.clear()
+                    self._nacks.clear()
+                    self._ack_tag = self._acked_tag = 0
+                    self._ack_scheduled = False
+                closed = self._wakeup = threading.Event()
+                self.rmq_connect.call_soon(partial(self._consume, channel, on_message, closed))
+                closed.wait()
+                if self._stopping and channel.is_open:
+                    if before_close is not None:
+                        before_close()
+                    closed.clear()
+                    self.rmq_connect.call_soon(partial(self._close, channel, closed))
+                    closed.wait()
+                self._channel = None
+                if not self._stopping:
+                    self._logging('error', f'the channel to queue "{self.queue}" was closed, reconnecting')
+        finally:
+            self._idle.set()
+                
+    def _consume(self, channel, on_message: Callable, closed: threading.Event) -> None:
+        if channel.is_open and self._stopping:
+            channel.close()
+        if not channel.is_open or self._stopping:
+            return closed.set()
+        channel.add_on_close_callback(lambda channel, reason: closed.set())
+        channel.basic_qos(prefetch_count=self.prefetch_count)
+        self._consumer_tag = channel.basic_consume(self.queue, on_message)
+        self._logging('info', f'started consuming queue "{self.queue}"')
+        
+    def stop_consuming(self) -> None:
+        self._stopping = True
+        self.rmq_connect.call_soon(self._cancel)
+        
+    def join(self, timeout: Optional[float] = None) -> bool:
+        return self._idle.wait(timeout)
+        
+    def _cancel(self) -> None:
+        channel, closed = self._channel, self._wakeup
+        if channel is None or not channel.is_open or self._consumer_tag is None:
+            return
+        channel.basic_cancel(self._consumer_tag, callback=lambda frame: closed.set())
+        self._consumer_tag = None
+        
+    def _close(self, channel, closed: threading.Event) -> None:
+        if not channel.is_open:
+            return closed.set()
+        self._flush_acks()
+        channel.close()
+        self._logging('info', f'stopped consuming queue "{self.queue}"')
+
+    def received(self, delivery_tag: int) -> Delivery:
+        with self._lock:
+            self._inflight[delivery_tag] = False
+            return Delivery(self._generation, delivery_tag)
+
+    def done(self, delivery: Delivery) -> None:
+        self._settle(delivery, requeue=False)
+
+    def failed(self, delivery: Delivery) -> None:
+        self._settle(delivery, requeue=True)
+
+    def _settle(self, delivery: Delivery, requeue: bool) -> None:
+        generation, delivery_tag = delivery
+        with self._lock:
+            if generation != self._generation or delivery_tag not in self._inflight:
+                return
+            self._inflight[delivery_tag] = True
+            if requeue:
+                self._nacks.append(delivery_tag)
+            while self._inflight:
+                tag = next(iter(self._inflight))
+                if not self._inflight[tag]:
+                    break
+                del self._inflight[tag]
+                self._ack_tag = tag
+            if (self._ack_tag <= self._acked_tag and not self._nacks) or self._ack_scheduled:
+                return
+            channel = self._channel
+            if channel is None or not channel.is_open:
+                return
+            self.rmq_connect.call_soon(self._flush_acks)
+            self._ack_scheduled = True
+
+    def _flush_acks(self) -> None:
+        with self._lock:
+            tag = self._ack_tag
+            nacks, self._nacks = self._nacks, []
+            self._ack_scheduled = False
+            channel = self._channel
+            if channel is None or not channel.is_open:
+                return
+            acked, self._acked_tag = self._acked_tag, max(tag, self._acked_tag)
+        for nack in nacks:
+            channel.basic_nack(delivery_tag=nack, requeue=True)
+        if tag > acked:
+            channel.basic_ack(delivery_tag=tag, multiple=True)
@@ -1,20 +1,31 @@
-import concurrent.futures
 import json
-import multiprocessing
+import os
+import socket
 import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime
-from functools import cached_property
+from datetime import datetime, timedelta
+from functools import cached_property, partial
 from logging import Logger
-from typing import NoReturn
+from typing import Any, Iterable, Mapping, NoReturn, Optional
 
 from sqlalchemy.orm.session import Session
 
 import schedulergodx.utils as utils
-from schedulergodx.service.consumer import Consumer
+from schedulergodx.service.claimer import Claimer
+from schedulergodx.service.consumer import Consumer, Delivery
+from schedulergodx.service.metrics import ServiceMetrics
+from schedulergodx.service.pool import (BackpressurePolicy, PoolSaturated,
+                                        WorkerPool)
+from schedulergodx.service.process_pool import ProcessPool
 from schedulergodx.service.publisher import Publisher
+from schedulergodx.service.registry import FunctionRegistry
+from schedulergodx.service.retention import ArchiveMode, Retention
+from schedulergodx.service.scheduler import Scheduler
 from schedulergodx.utils.logger import LoggerConstructor
-from schedulergodx.utils.storage import DB
+from schedulergodx.utils.metrics import MetricsRegistry
+from schedulergodx.utils.storage import DB, Durability, WriteBuffer
 
 
 class _Client:
@@ -22,20 +33,26 @@ class _Client:
     def __init__(self, name: str, enable_overdue: bool = False) -> None:
         self.name = name
         self.enable_overdue = enable_overdue
+        self.codec: utils.Codec = utils.JSON_CODEC
     
     def __repr__(self) -> str:
         return self.name
         
-    def __eq__(self, other_client: '_Client') -> bool:
+    def __eq__(self, other_client: '_Client | str') -> bool:
+        if isinstance(other_client, _Client):
+            return self.name == other_client.name
         return self.name == other_client
     
+    def __hash__(self) -> int:
+        return hash(self.name)
+    
     
 class Task:
     
-    def __init__(self, id: utils.MessageId, time_to_start: utils.Serializable, db: DB) -> None:
+    def __init__(self, id: utils.MessageId, time_to_start: utils.Serializable | datetime | float, db: DB) -> None:
         self.db = db
         self.id = id
-        self.time_to_start: datetime = utils.MessageConstructor.deserialization(time_to_start)
+        self.time_to_start: datetime = utils.MessageConstructor.load_time_to_start(time_to_start)
         self.overdue = False if self.get_time_delta() > 0 else True
         
     def __repr__(self) -> str:
@@ -51,64 +68,138 @@ class Task:
         delay = self.get_time_delta()
         if delay <= 0: return 0
         return delay
+    
+    def get_timestamp(self) -> float:
+        return self.time_to_start.timestamp()
         
-    def db_save(self, db_session: Session, client: str, func: utils.Serializable, func_args: utils.Serializable, 
-                func_kwargs: utils.Serializable, lifetime: int, hard: bool = False) -> None:
-        task = self.db.Task(
-           id = self.id,
-           client = client,
-           status = utils.TaskStatus.WAITING,
-           time_to_start = utils.MessageConstructor.serialization(self.time_to_start),
-           task = func,
-           task_args = func_args,
-           task_kwargs = func_kwargs,
-           lifetime = lifetime,
-           hard = hard
-        )
-        db_session.add(task)
-        db_session.commit()
-        
-    def run(self, db_session: Session) -> utils.DB.Task:
-        task: utils.DB.Task = db_session.query(self.db.Task).get(self.id)
-        task.status = utils.TaskStatus.WORK
-        db_session.commit()
-        return task
+    def db_save(self, writer: WriteBuffer, client: str, func: utils.Serializable | None, func_args: utils.Serializable, 
+                func_kwargs: utils.Serializable, lifetime: int, hard: bool = False, 
+                function_hash: Optional[str] = None, args_encoding: Optional[str] = None,
+                lease_owner: Optional[str] = None, lease_expires: Optional[datetime] = None) -> Future:
+        return writer.insert([{
+           'id': self.id,
+           'client': client,
+           'status': utils.TaskStatus.WAITING,
+           'time_to_start': self.time_to_start,
+           'task': func,
+           'function_hash': function_hash,
+           'task_args': func_args,
+           'args_encoding': args_encoding,
+           'task_kwargs': func_kwargs,
+           'lifetime': lifetime,
+           'hard': hard,
+           'lease_owner': lease_owner,
+           'lease_expires': lease_expires
+        }], wait=False)
         
 
 class ClientPool:
     
-    def __init__(self, db: utils.DB, clients: list = []) -> None:
-        self.clients: list[_Client] = clients
+    def __init__(self, db: utils.DB, clients: Optional[Iterable[_Client]] = None) -> None:
+        self._clients: dict[str, _Client] = {client.name: client for client in clients or ()}
+        self._lock = threading.Lock()
         self.db = db
     
     def __repr__(self) -> str:
-        return f'<ClientPool (size: {len(self.clients)})>'
+        return f'<ClientPool (size: {len(self._clients)})>'
+    
+    def __len__(self) -> int:
+        return len(self._clients)
         
-    def __contains__(self, item: _Client) -> bool:
-        return item in self.clients
+    def __contains__(self, item: _Client | str) -> bool:
+        return (item.name if isinstance(item, _Client) else item) in self._clients
+    
+    @property
+    def clients(self) -> list[_Client]:
+        return list(self._clients.values())
     
-    def append(self, client: _Client, db_session: Session) -> None:
-        self.clients.append(client)
-        self.db.add_client(client.__dict__, db_session)
+    def append(self, client: _Client, db_session: Session) -> _Client:
+        with self._lock:
+            known = self._clients.get(client.name)
+            if known is not None and known.enable_overdue == client.enable_overdue:
+                known.codec = client.codec
+                return known
+            self._clients[client.name] = client
+        self.db.add_client({'name': client.name, 'enable_overdue': client.enable_overdue}, db_session)
+        return client
         
-    def get_client_by_name(self, name: str) -> _Client| None:
-        for client in self.clients:
-            if name == client.name:
-                return client
+    def load(self, name: str, db_session: Session) -> _Client | None:
+        client = self.db.get_client_dict(name, db_session)
+        if client is None:
+            return None
+        with self._lock:
+            return self._clients.setdefault(name, _Client(**client))
+        
+    def get_client_by_name(self, name: str) -> _Client | None:
+        return self._clients.get(name)
                 
     
 @dataclass
 class Service(utils.AbstractionCore):
     name: str = 'service'
     db: DB = DB(service_db=True)
+    max_workers: int = 10
+    max_queue: int = 1000
+    backpressure: BackpressurePolicy = BackpressurePolicy.BLOCK
+    spill_delay: utils.Seconds = 5
+    max_processes: int = 2
+    max_tasks_per_child: Optional[int] = None
+    process_start_method: Optional[str] = None
+    function_cache_size: int = 256
+    recovery_horizon: Optional[utils.Seconds] = 300
+    recovery_batch_size: int = 1000
+    claim_batch_size: int = 100
+    durability: Durability = Durability.GROUP
+    commit_interval: float = 0.005
+    commit_rows: int = 500
+    prefetch_count: int = 1000
+    node_id: Optional[str] = None
+    lease_time: utils.Seconds = 30
+    heartbeat_interval: utils.Seconds = 10
+    retention_ttl: Optional[utils.Seconds] = None
+    retention_interval: utils.Seconds = 60
+    retention_batch_size: int = 500
+    archive: ArchiveMode = ArchiveMode.NONE
+    archive_path: str = 'SchedulerGodX-archive.jsonl.gz'
+    compaction_interval: Optional[utils.Seconds] = 24 * 60 * 60
+    store_results: bool = True
+    result_inline_size: int = 4096
+    max_result_size: int = 16 * 1024 * 1024
+    metrics_port: Optional[int] = None
+    metrics_host: str = '127.0.0.1'
+    stop_timeout: utils.Seconds = 10
     
     def __post_init__(self) -> None:
         self.publisher = Publisher('publisher', rmq_que=self.rmq_publisher_que, 
                                    logger=self.logger, rmq_connect=self.rmq_connect)
-        self.consumer = Consumer('consumer', rmq_que=self.rmq_consumer_que, 
-                                 logger=self.logger, rmq_connect=self.rmq_connect)
-        self.db_session = self.db.get_session()
-        self._logging('info', f'successful initialization')
+        self.consumer = Consumer('consumer', rmq_que=self.rmq_consumer_que, logger=self.logger, 
+                                 rmq_connect=self.rmq_connect, prefetch_count=self.prefetch_count)
+        self.writer = WriteBuffer(self.db, durability=self.durability, interval=self.commit_interval,
+                                  max_rows=self.commit_rows, logger=self.logger)
+        self.worker_pool = WorkerPool(self.max_workers, self.max_queue, 
+                                      logger=self.logger, policy=self.backpressure)
+        self.process_pool = ProcessPool(self.max_processes, logger=self.logger, 
+                                        max_tasks_per_child=self.max_tasks_per_child,
+                                        start_method=self.process_start_method)
+        self.scheduler = Scheduler(logger=self.logger)
+        self._recovery = ThreadPoolExecutor(max_workers=1, thread_name_prefix='recovery')
+        self.function_registry = FunctionRegistry(self.db, cache_size=self.function_cache_size)
+        self.metrics = ServiceMetrics(MetricsRegistry(), self)
+        self.retention = None if self.retention_ttl is None else Retention(
+            self.db, self.retention_ttl, logger=self.logger, batch_size=self.retention_batch_size,
+            interval=self.retention_interval, archive=self.archive, archive_path=self.archive_path,
+            compaction_interval=self.compaction_interval
+            )
+        self._horizon: Optional[float] = None
+        self._running: set[utils.MessageId] = set()
+        self._stop_lock = threading.Lock()
+        self._stopped = False
+        if self.node_id is None:
+            self.node_id = f'{self.name}-{socket.gethostname()}-{os.getpid()}'
+        self.claimer = Claimer(self.db, self.writer, owner=self.node_id, lease=self.lease, logger=self.logger,
+                               on_claimed=self._submit_task, on_missed=self._claim_missed,
+                               batch_size=self.claim_batch_size)
+        self._logging('info', f'successful initialization (node: {self.node_id})')
     
     @property
     def rmq_publisher_que(self) -> str:
@@ -123,114 +214,377 @@ class Service(utils.AbstractionCore):
        return LoggerConstructor(name=self.name).getLogger()
    
     def _pre_start(self) -> None:
-        clients = [_Client(**client) for client in self.db.get_clients_dicts(self.db_session)]
+        with self.db.session() as db_session:
+            clients = [_Client(**client) for client in self.db.get_clients_dicts(db_session)]
         self.client_pool = ClientPool(self.db, clients)
+        self.function_registry.load()
+        self.writer.start()
+        self.process_pool.start()
+        self.worker_pool.start()
+        self.claimer.start()
+        self.scheduler.start()
         self._launch_unfulfilled_tasks()
+        if self.retention is not None:
+            self.retention.start()
+        if self.metrics_port is not None:
+            self.metrics.registry.serve(self.metrics_port, self.metrics_host)
         self._logging('info', 'pre-start successful')
    
+    def _publish(self, data: Mapping) -> None:
+        client = self.client_pool.get_client_by_name(data['client'])
+        self.publisher.publish(data, codec=client.codec if client else utils.JSON_CODEC,
+                               routing_key=f'{self.rmq_publisher_que}.{data["client"]}')
+        
     def _error_message(self, message_id: utils.MessageId, client: str, 
                        error: utils.MessageErrorStatus, error_message: str) -> None:
-        self.publisher.publish(data=utils.MessageConstructor.error(
+        self._publish(utils.MessageConstructor.error(
             id = message_id, client = client,
             error = error, message = error_message
         ))
-        self._logging('error', f'Error {error} (message id: {message_id}, client: {client})')
+        self._logging('error', 'Error %s (message id: %s, client: %s)', error, message_id, client)
+        
+    def _unknown_function(self, message: utils.MessageDisassemble) -> bool:
+        function_hash = message.arguments.get('function_hash', message.arguments.get('hash'))
+        if function_hash is None or function_hash in self.function_registry:
+            return False
+        self._error_message(
+            message_id = message.metadata['id'],
+            client = message.metadata['client'],
+            error = utils.MessageErrorStatus.UNKNOWN_FUNCTION,
+            error_message = f'function {function_hash} is not registered'
+        )
+        return True
+        
+    @property
+    def lease(self) -> timedelta:
+        return timedelta(seconds=self.lease_time)
         
     def _launch_unfulfilled_tasks(self) -> None:
-        for db_task in self.db.get_unfulfilled_tasks(self.db_session):
-            task_client = self.client_pool.get_client_by_name(db_task.client)
-            task = Task(
-                id = db_task.id,
-                time_to_start = db_task.time_to_start,
-                db = self.db
+        now = datetime.now()
+        clients = self.client_pool.clients
+        with self.db.session() as db_session:
+            reclaimed = self.db.reclaim_expired(now, db_session)
+            orphans = self.db.mark_orphans([client.name for client in clients], db_session, owner=self.node_id)
+            overdue = self.db.mark_overdue(
+                [client.name for client in clients if not client.enable_overdue], now, db_session, 
+                owner=self.node_id
                 )
-            if not task_client: 
-                db_task.status = utils.TaskStatus.ORPHAN
-                self.db_session.commit()
-            elif (not task.overdue) or (task.overdue and task_client.enable_overdue):
-                self._add_task(
-                    task = task,
-                    hard = db_task.hard
-                    )
+        self._logging('info', f'recovery: {reclaimed} expired leases were reclaimed, '
+                              f'{orphans} orphaned and {overdue} overdue tasks were marked')
+        self._push_heartbeat()
+        if self.recovery_horizon is None:
+            return self._page_in(since=None, until=None)
+        self._page_in(since=None, until=now + timedelta(seconds=self.recovery_horizon))
         
-    def _task_work(self, task: Task) -> None:
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:   
-            thread_db_session = self.db.get_session()                        
-            task = task.run(thread_db_session)
-            func, args, kwargs = utils.MessageConstructor.bulk_deserialization(
-                task.task, task.task_args, task.task_kwargs
-                )
-            future = executor.submit(func, *args, **kwargs)
-            try:
-                future.result(timeout=task.lifetime)
-                self._logging('info', f'task is completed (id: {task.id})')
-                self.publisher.publish(utils.MessageConstructor.info(
-                    id = task.id, client = task.client,
-                    responce = utils.MessageInfoStatus.OK.value
-                ))
-                task.status = utils.TaskStatus.COMPLETED
-            except concurrent.futures.TimeoutError:
-                task.status = utils.TaskStatus.ERROR
-                self._error_message(message_id = task.id, client = task.client, 
-                                    error = utils.MessageErrorStatus.TASK_TIMEOT_ERROR,
-                                    error_message = f'task {task.id} was canceled due to an error timeout')            
-            except Exception as e:
-                task.status = utils.TaskStatus.ERROR
-                self._error_message(message_id = task.id, client = task.client, 
-                                    error = utils.MessageErrorStatus.ERROR_IN_TASK,
-                                    error_message = f'task {task.id}: {e}')
-            finally:
-                thread_db_session.commit()
-                
-    def _hard_task_work(self, task: Task) -> None:
-        thread_db_session = self.db.get_session()
-        task = task.run(thread_db_session)
-        func, args, kwargs = utils.MessageConstructor.bulk_deserialization(
-                task.task, task.task_args, task.task_kwargs
+    def _push_heartbeat(self) -> None:
+        self.scheduler.push(
+            key = ('heartbeat', self.node_id),
+            when = time.time() + self.heartbeat_interval,
+            callback = partial(self._recovery.submit, self._heartbeat)
+            )
+        
+    def _is_local(self, task_id: utils.MessageId) -> bool:
+        return task_id in self.scheduler or task_id in self._running
+        
+    def _adopt(self, ids: list[utils.MessageId], db_session: Session) -> int:
+        tasks = [
+            Task(id = row.id, time_to_start = row.time_to_start, db = self.db)
+            for row in self.db.adopt_tasks(ids, self.node_id, datetime.now() + self.lease, db_session)
+        ]
+        if tasks:
+            self._add_tasks(tasks)
+        return len(tasks)
+        
+    def _adopt_leasable(self, db_session: Session) -> int:
+        ids = []
+        for row in self.db.iter_unfulfilled_tasks(db_session, batch_size = self.recovery_batch_size,
+                                                  until = self._horizon_datetime(),
+                                                  statuses = (utils.TaskStatus.WAITING,), leasable = True):
+            if not self._is_local(row.id):
+                ids.append(row.id)
+            if len(ids) >= self.recovery_batch_size:
+                break
+        return self._adopt(ids, db_session)
+        
+    def _heartbeat(self) -> None:
+        now = datetime.now()
+        try:
+            with self.db.session() as db_session:
+                renewed = self.db.renew_leases(self.node_id, now + self.lease, db_session,
+                                                until = self._horizon_datetime())
+                reclaimed = self.db.reclaim_expired(now, db_session)
+                adopted = 0 if self.worker_pool.holding() else self._adopt_leasable(db_session)
+        except Exception as e:
+            self._logging('error', f'heartbeat failed: {e}')
+        else:
+            self._logging('debug', f'heartbeat: {renewed} leases were renewed, {reclaimed} reclaimed, '
+                                   f'{adopted} tasks adopted')
+        finally:
+            self._push_heartbeat()
+            
+    def _horizon_datetime(self) -> Optional[datetime]:
+        return None if self._horizon is None else datetime.fromtimestamp(self._horizon)
+        
+    def _retry_page_in(self, since: Optional[datetime], until: Optional[datetime]) -> None:
+        self.scheduler.push(
+            key = ('recovery', since, until),
+            when = time.time() + self.heartbeat_interval,
+            callback = partial(self._recovery.submit, self._page_in, since, until)
+            )
+        
+    def _page_in(self, since: Optional[datetime], until: Optional[datetime]) -> None:
+        if since is not None and self.worker_pool.holding():
+            self._logging('info', f'recovery is paused while the worker pool holds tasks (until: {until})')
+            return self._retry_page_in(since, until)
+        self._horizon = until.timestamp() if until else None
+        loaded = 0
+        ids = []
+        try:
+            with self.db.session() as db_session:
+                for row in self.db.iter_unfulfilled_tasks(db_session, since = since, until = until,
+                                                          batch_size = self.recovery_batch_size,
+                                                          statuses = (utils.TaskStatus.WAITING,), 
+                                                          leasable = True, owner = self.node_id):
+                    if not self._is_local(row.id):
+                        ids.append(row.id)
+                    if len(ids) >= self.recovery_batch_size:
+                        loaded += self._adopt(ids, db_session)
+                        ids = []
+                loaded += self._adopt(ids, db_session)
+        except Exception as e:
+            self._logging('error', f'recovery failed, retrying in {self.heartbeat_interval}s (until: {until}): {e}')
+            return self._retry_page_in(since, until)
+        self._logging('info', f'recovery: {loaded} tasks were loaded (until: {until})')
+        if until is not None:
+            self.scheduler.push(
+                key = ('recovery', until),
+                when = until.timestamp() - self.recovery_horizon / 2,
+                callback = partial(self._recovery.submit, self._page_in, until, 
+                                   until + timedelta(seconds=self.recovery_horizon))
                 )
-        process = multiprocessing.Process(target=func, args=args, kwargs=kwargs)
+            
+    def _task_work(self, task: utils.DB.Task) -> None:
+        started = time.time()
+        self.metrics.start_delay.observe(max(started - task.time_to_start.timestamp(), 0))
+        timeout_key = (task.id, 'timeout')
+        finished = threading.Lock()
+        self.scheduler.push(
+            key = timeout_key,
+            when = time.time() + task.lifetime,
+            callback = partial(self._task_timeout, task.id, task.client, finished)
+            )
         try:
-            process.start()
-            process.join(float(task.lifetime))
-            if process.is_alive():
-                process.terminate()
-                process.join()
-                task.status = utils.TaskStatus.ERROR
-                self._error_message(
-                    message_id = task.id, client = task.client,
-                    error = utils.MessageErrorStatus.TASK_TIMEOT_ERROR,
-                    error_message = f'task {task.id} was canceled due to an error timeout'
+            if task.function_hash:
+                func = self.function_registry.get(task.function_hash)
+            else:
+                func = utils.MessageConstructor.deserialization(task.task)
+            args, kwargs = utils.MessageConstructor.decode_arguments(
+                task.args_encoding, task.task_args, task.task_kwargs
                 )
+            result = func(*args, **kwargs)
+            if not finished.acquire(blocking=False):
+                return
+            self.scheduler.cancel(timeout_key)
+            self.metrics.completed.inc()
+            self._logging('debug', 'task is completed (id: %s)', task.id)
+            self._publish(utils.MessageConstructor.info(
+                id = task.id, client = task.client,
+                responce = utils.MessageInfoStatus.OK.value,
+                **self._save_result(task, result)
+            ))
+            task.status = utils.TaskStatus.COMPLETED
         except Exception as e:
+            if not finished.acquire(blocking=False):
+                return
+            self.scheduler.cancel(timeout_key)
+            self.metrics.failed.inc()
             task.status = utils.TaskStatus.ERROR
             self._error_message(message_id = task.id, client = task.client, 
                                 error = utils.MessageErrorStatus.ERROR_IN_TASK,
                                 error_message = f'task {task.id}: {e}')
         finally:
-            thread_db_session.commit()
+            self.metrics.run.observe(time.time() - started)
+            if task.status is not utils.TaskStatus.WORK:
+                self._release(task.id, task.status)
+            else:
+                self.worker_pool.mark_hung(False)
+            
+    def _save_result(self, task: utils.DB.Task, result: Any) -> dict[str, Any]:
+        if result is None:
+            return {}
+        try:
+            encoding, data = utils.MessageConstructor.encode_result(result)
+        except Exception as e:
+            return {'result_error': f'the result cannot be serialized: {e}'}
+        if len(data) > self.max_result_size:
+            return {'result_error': f'the result exceeds {self.max_result_size} bytes'}
+        arguments = {'result_encoding': encoding.value, 'result_size': len(data)}
+        if len(data) <= self.result_inline_size:
+            arguments['result'] = utils.MessageConstructor.result_payload(encoding.value, data)
+        elif not self.store_results:
+            return {'result_error': f'the result exceeds {self.result_inline_size} bytes and is not stored'}
+        else:
+            arguments['result_stored'] = True
+        if self.store_results:
+            self.writer.add_result({
+                'id': task.id,
+                'client': task.client,
+                'encoding': encoding.value,
+                'size': len(data),
+                'data': data,
+                'created_at': datetime.now()
+            })
+        return arguments
+    
+    def _release(self, task_id: utils.MessageId, status: utils.TaskStatus, wait: bool = True) -> None:
+        self.writer.set_status(task_id, status, wait=wait, lease_owner=None, lease_expires=None,
+                               finished_at=datetime.now())
             
-    def _add_task(self, task: Task, hard: bool = False) -> None:
-        def wrapper() -> None:
-            self._task_work(task)
-        def hard_wrapper() -> None:
-            self._hard_task_work(task)
-        timer = threading.Timer(
-            interval = task.get_delay(),
-            function = wrapper if not hard else hard_wrapper
+    def _task_timeout(self, task_id: utils.MessageId, client: str, finished: threading.Lock) -> None:
+        if not finished.acquire(blocking=False):
+            return
+        self.metrics.timeouts.inc()
+        self.worker_pool.mark_hung()
+        self._release(task_id, utils.TaskStatus.ERROR, wait=False)
+        self._error_message(message_id = task_id, client = client, 
+                            error = utils.MessageErrorStatus.TASK_TIMEOT_ERROR,
+                            error_message = f'task {task_id} was canceled due to an error timeout')
+                
+    def _hard_task_work(self, task: utils.DB.Task) -> None:
+        started = time.time()
+        self.metrics.start_delay.observe(max(started - task.time_to_start.timestamp(), 0))
+        try:
+            result = self.process_pool.run(
+                func = self.function_registry.get_body(task.function_hash) if task.function_hash else task.task, 
+                args = task.task_args, kwargs = task.task_kwargs, args_encoding = task.args_encoding,
+                timeout = float(task.lifetime), func_key = task.function_hash
+                )
+            self.metrics.completed.inc()
+            self._logging('debug', 'hard task is completed (id: %s)', task.id)
+            self._publish(utils.MessageConstructor.info(
+                id = task.id, client = task.client,
+                responce = utils.MessageInfoStatus.OK.value,
+                **self._save_result(task, result)
+            ))
+            task.status = utils.TaskStatus.COMPLETED
+        except TimeoutError:
+            self.metrics.timeouts.inc()
+            task.status = utils.TaskStatus.ERROR
+            self._error_message(
+                message_id = task.id, client = task.client,
+                error = utils.MessageErrorStatus.TASK_TIMEOT_ERROR,
+                error_message = f'task {task.id} was canceled due to an error timeout'
             )
-        timer.start()
+        except Exception as e:
+            self.metrics.failed.inc()
+            task.status = utils.TaskStatus.ERROR
+            self._error_message(message_id = task.id, client = task.client, 
+                                error = utils.MessageErrorStatus.ERROR_IN_TASK,
+                                error_message = f'task {task.id}: {e}')
+        finally:
+            self.metrics.run.observe(time.time() - started)
+            if task.status is not utils.TaskStatus.WORK:
+                self._release(task.id, task.status)
+            
+    def _run_task(self, task: utils.DB.Task) -> None:
+        try:
+            (self._hard_task_work if task.hard else self._task_work)(task)
+        finally:
+            self._running.discard(task.id)
+            
+    def _claim(self, task_id: utils.MessageId) -> None:
+        self._running.add(task_id)
+        self.claimer.add(task_id)
+        
+    def _claim_missed(self, task_id: utils.MessageId) -> None:
+        self._running.discard(task_id)
+        self._logging('debug', 'task %s was claimed by another node', task_id)
+            
+    def _submit_task(self, task: utils.DB.Task) -> None:
+        try:
+            self.worker_pool.submit(self._run_task, task)
+        except PoolSaturated as e:
+            self._running.discard(task.id)
+            if self.backpressure is BackpressurePolicy.SPILL:
+                self.writer.set_status(task.id, utils.TaskStatus.WAITING, wait=False, lease_owner=None,
+                                       lease_expires=datetime.now() + timedelta(seconds=self.spill_delay))
+                return self._logging('debug', f'task {task.id} was spilled to the database for {self.spill_delay}s: {e}')
+            self.metrics.rejected.inc()
+            self._release(task.id, utils.TaskStatus.CANCELLED, wait=False)
+            self._error_message(message_id = task.id, client = task.client, 
+                                error = utils.MessageErrorStatus.SERVICE_OVERLOADED,
+                                error_message = f'task {task.id} was rejected: {e}')
+            
+    def _add_tasks(self, tasks: list[Task], write: Optional[Future] = None) -> None:
+        self.metrics.tasks.inc(len(tasks))
+        self._schedule(tasks, write)
+        
+    def _schedule(self, tasks: list[Task], write: Optional[Future] = None) -> None:
+        now = time.time()
+        deferred = []
+        beyond = []
+        for task in tasks:
+            if task.get_timestamp() <= now:
+                self._claim(task.id)
+            elif self._beyond_horizon(task):
+                beyond.append(task)
+            else:
+                deferred.append((task.id, task.get_timestamp(), partial(self._claim, task.id)))
+        self.scheduler.push_many(deferred)
+        if beyond and write is not None:
+            write.add_done_callback(partial(self._schedule_paged_in, beyond))
+            
+    def _schedule_paged_in(self, tasks: list[Task], write: Future) -> None:
+        if write.exception() is None:
+            self._schedule([task for task in tasks if not self._beyond_horizon(task)])
+            
+    def _beyond_horizon(self, task: Task) -> bool:
+        return self._horizon is not None and task.get_timestamp() >= self._horizon
+        
+    def _load_client(self, name: str, content_type: Optional[str]) -> bool:
+        with self.db.session() as db_session:
+            client = self.client_pool.load(name, db_session)
+        if client is None:
+            return False
+        client.codec = utils.get_codec(content_type)
+        self._logging('info', f'client {client} was initialized by another node')
+        return True
         
     def _on_message(self, channel, method_frame, header_frame, body) -> None:
-        channel.basic_ack(method_frame.delivery_tag)
+        received = time.time()
+        self.metrics.messages.inc()
+        delivery = self.consumer.received(method_frame.delivery_tag)
+        try:
+            write = self._handle_message(header_frame, body)
+        except:
+            self.consumer.done(delivery)
+            raise
+        finally:
+            self.metrics.handling.observe(time.time() - received)
+        if write is None:
+            return self.consumer.done(delivery)
+        write.add_done_callback(partial(self._message_committed, delivery, received))
+        
+    def _message_committed(self, delivery: Delivery, received: float, write: Future) -> None:
+        if write.exception() is not None:
+            self._logging('error', f'the tasks of message {delivery.tag} were not saved, requeueing: {write.exception()}')
+            return self.consumer.failed(delivery)
+        self.metrics.persist.observe(time.time() - received)
+        self.worker_pool.when_ready(partial(self.consumer.done, delivery))
+        
+    def _handle_message(self, header_frame, body) -> Optional[Future]:
         try:
-            message = utils.MessageConstructor.disassemble(body)
+            message = utils.MessageConstructor.disassemble(body, header_frame.content_type)
         except json.JSONDecodeError:
             return self._logging('error', 'a non-json message was received')
+        except utils.CodecError as e:
+            return self._logging('error', f'the received message cannot be decoded: {e}')
         except KeyError:
             return self._logging('error', 'the received message has an incorrect format')
             
         if (message.metadata['client'] not in self.client_pool 
-            and message.metadata['type'] != utils.Message.INITIALIZATION):
+            and message.metadata['type'] != utils.Message.INITIALIZATION
+            and not self._load_client(message.metadata['client'], header_frame.content_type)):
             return self._error_message(
                 message_id = message.metadata['id'], 
                 client = message.metadata['client'],
@@ -243,42 +597,73 @@ class Service(utils.AbstractionCore):
             case utils.Message.INITIALIZATION:
                 try:
                     client = _Client(message.metadata['client'], **message.arguments)
-                except TypeError:
+                    client.codec = utils.get_codec(header_frame.content_type)
+                except (TypeError, utils.CodecError):
                     return self._error_message(
                         message_id = message.metadata['id'],
                         client = message.metadata['client'],
                         error = utils.MessageErrorStatus.BAD_INITIALIZATION,
                         error_message = 'incorrect client parameters'
                     )
-                self.client_pool.append(client, self.db_session)
+                with self.db.session() as db_session:
+                    client = self.client_pool.append(client, db_session)
                 self._logging('info', f'client {client} has been initialized') 
-                self.publisher.publish(data = utils.MessageConstructor.info(
+                self._publish(utils.MessageConstructor.info(
                     id = message.metadata['id'],
                     client = message.metadata['client'],
                     responce = utils.MessageInfoStatus.OK.value
                 ))
             
             case utils.Message.INFO:
-                return self._logging('info', f'info message: {body}')
+                return self._logging('debug', 'info message: %s', body)
+            
+            case utils.Message.FUNCTION:
+                function_hash = message.arguments.get('hash')
+                if 'function' in message.arguments:
+                    try:
+                        self.function_registry.add(function_hash, message.arguments['function'])
+                    except ValueError as e:
+                        return self._error_message(
+                            message_id = message.metadata['id'],
+                            client = message.metadata['client'],
+                            error = utils.MessageErrorStatus.INVALID_TASK,
+                            error_message = str(e)
+                        )
+                    self._logging('info', f'function {function_hash} has been registered')
+                elif self._unknown_function(message):
+                    return
+                self._publish(utils.MessageConstructor.info(
+                    id = message.metadata['id'],
+                    client = message.metadata['client'],
+                    responce = utils.MessageInfoStatus.OK.value
+                ))
             
             case utils.Message.TASK: 
+                if self._unknown_function(message):
+                    return
                 try:
                     task = Task(
                         db = self.db,
                         id = message.metadata['id'],
                         time_to_start = message.arguments['time_to_start'] 
                     )
-                    task.db_save(
-                        db_session = self.db_session,
+                    encoding = message.arguments.get('encoding')
+                    write = task.db_save(
+                        writer = self.writer,
                         client = message.metadata['client'],
-                        func = message.arguments['function'],
-                        func_args = message.arguments['args'],
-                        func_kwargs = message.arguments['kwargs'],
+                        func = utils.MessageConstructor.as_text(message.arguments.get('function')),
+                        func_args = utils.MessageConstructor.store_arguments(encoding, message.arguments['args']),
+                        func_kwargs = utils.MessageConstructor.store_arguments(encoding, message.arguments['kwargs']),
+                        args_encoding = encoding,
                         lifetime = message.arguments['lifetime'],
-                        hard = message.arguments['hard']
+                        hard = message.arguments['hard'],
+                        function_hash = message.arguments.get('function_hash'),
+                        lease_owner = self.node_id,
+                        lease_expires = datetime.now() + self.lease
                     )
-                    self._add_task(task, hard=message.arguments['hard'])
-                    self._logging('info', f'The task was received (id: {task.id})')
+                    self._add_tasks([task], write)
+                    self._logging('debug', 'The task was received (id: %s)', task.id)
+                    return write
                 except:
                     return self._error_message(
                         message_id = message.metadata['id'],
@@ -287,6 +672,78 @@ class Service(utils.AbstractionCore):
                         error_message = 'the task has an incorrect format'
                     )
             
+            case utils.Message.TASK_BATCH:
+                if self._unknown_function(message):
+                    return
+                try:
+                    time_to_start = utils.MessageConstructor.load_time_to_start(message.arguments['time_to_start'])
+                    function = utils.MessageConstructor.as_text(message.arguments.get('function'))
+                    tasks = [
+                        Task(db = self.db, id = item['id'], time_to_start = time_to_start)
+                        for item in message.arguments['tasks']
+                    ]
+                    lease_expires = datetime.now() + self.lease
+                    write = self.writer.insert([
+                        {
+                            'id': item['id'],
+                            'client': message.metadata['client'],
+                            'status': utils.TaskStatus.WAITING,
+                            'time_to_start': time_to_start,
+                            'task': function,
+                            'function_hash': message.arguments.get('function_hash'),
+                            'task_args': utils.MessageConstructor.store_arguments(item.get('encoding'), item['args']),
+                            'task_kwargs': utils.MessageConstructor.store_arguments(item.get('encoding'), item['kwargs']),
+                            'args_encoding': item.get('encoding'),
+                            'lifetime': message.arguments['lifetime'],
+                            'hard': message.arguments['hard'],
+                            'lease_owner': self.node_id,
+                            'lease_expires': lease_expires
+                        }
+                        for item in message.arguments['tasks']
+                    ], wait=False)
+                except:
+                    return self._error_message(
+                        message_id = message.metadata['id'],
+                        client = message.metadata['client'],
+                        error = utils.MessageErrorStatus.INVALID_TASK,
+                        error_message = 'the task batch has an incorrect format'
+                    )
+                self._add_tasks(tasks, write)
+                self._logging('debug', 'The task batch was received (id: %s, tasks: %d)', message.metadata['id'], len(tasks))
+                self._publish(utils.MessageConstructor.info(
+                    id = message.metadata['id'],
+                    client = message.metadata['client'],
+                    responce = utils.MessageInfoStatus.OK.value,
+                    ids = [task.id for task in tasks]
+                ))
+                return write
+            
+            case utils.Message.RESULT:
+                task_id = message.arguments.get('task_id')
+                with self.db.session() as db_session:
+                    result = self.db.get_result(task_id, db_session)
+                    if result is None:
+                        db_session.rollback()
+                        self.writer.flush()
+                        result = self.db.get_result(task_id, db_session)
+                    if result is None:
+                        return self._task_outcome(message, task_id, db_session)
+                    if result.client != message.metadata['client']:
+                        return self._error_message(
+                            message_id = message.metadata['id'],
+                            client = message.metadata['client'],
+                            error = utils.MessageErrorStatus.RESULT_NOT_FOUND,
+                            error_message = f'there is no result of the task {task_id}'
+                        )
+                    self._publish(utils.MessageConstructor.info(
+                        id = message.metadata['id'],
+                        client = message.metadata['client'],
+                        responce = utils.MessageInfoStatus.OK.value,
+                        result = utils.MessageConstructor.result_payload(result.encoding, result.data),
+                        result_encoding = result.encoding,
+                        result_size = result.size
+                    ))
+            
             case _:
                     return self._error_message(
                     message_id = message.metadata['id'],
@@ -295,8 +752,60 @@ class Service(utils.AbstractionCore):
                     error_message = 'invalid message type received'
                 )
         
+    def _task_outcome(self, message: utils.MessageDisassemble, task_id: utils.MessageId, 
+                      db_session: Session) -> None:
+        task = db_session.get(self.db.Task, task_id)
+        if task is None or task.client != message.metadata['client'] or task.status in (
+            utils.TaskStatus.WAITING, utils.TaskStatus.WORK):
+            return self._error_message(
+                message_id = message.metadata['id'],
+                client = message.metadata['client'],
+                error = utils.MessageErrorStatus.RESULT_NOT_FOUND,
+                error_message = f'there is no result of the task {task_id}'
+            )
+        if task.status is not utils.TaskStatus.COMPLETED:
+            return self._error_message(
+                message_id = message.metadata['id'],
+                client = message.metadata['client'],
+                error = utils.MessageErrorStatus.ERROR_IN_TASK,
+                error_message = f'task {task_id} finished with status {task.status.name}'
+            )
+        arguments = {} if self.store_results else {'result_error': f'the result of task {task_id} is not stored'}
+        self._publish(utils.MessageConstructor.info(
+            id = message.metadata['id'],
+            client = message.metadata['client'],
+            responce = utils.MessageInfoStatus.OK.value,
+            **arguments
+        ))
+        
+    def _drain(self) -> None:
+        self.writer.flush()
+        self.worker_pool.release_waiters()
+        
     def start(self) -> NoReturn:         
         self._pre_start()       
-        self.consumer.start_consuming(self._on_message)
+        try:
+            self.consumer.start_consuming(self._on_message, before_close=self._drain)
+        finally:
+            self.stop()
+            
+    def stop(self) -> None:
+        with self._stop_lock:
+            if self._stopped:
+                return
+            self._stopped = True
+        self.consumer.stop_consuming()
+        self.consumer.join(self.stop_timeout)
+        if self.retention is not None:
+            self.retention.stop()
+        self.scheduler.stop()
+        self._recovery.shutdown(wait=True, cancel_futures=True)
+        self.claimer.stop()
+        self.worker_pool.shutdown(wait=True)
+        self.process_pool.shutdown()
+        self.publisher.close(self.stop_timeout)
+        self.writer.close()
+        self.metrics.registry.shutdown()
+        self._logging('info', 'service stopped')
         
         
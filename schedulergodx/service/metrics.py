@@ -0,0 +1,30 @@
+from typing import TYPE_CHECKING
+
+from schedulergodx.utils.metrics import MetricsRegistry
+
+if TYPE_CHECKING:
+    from schedulergodx.service.core import Service
+
+
+class ServiceMetrics:
+
+    def __init__(self, registry: MetricsRegistry, service: 'Service') -> None:
+        self.registry = registry
+        self.messages = registry.counter('messages_received', 'messages received from clients')
+        self.handling = registry.histogram('message_handling_seconds', 'time spent handling a message on the consumer')
+        self.persist = registry.histogram('task_persist_seconds', 'time from receiving a message until its tasks are committed')
+        self.tasks = registry.counter('tasks_received', 'tasks received or recovered')
+        self.start_delay = registry.histogram('task_start_delay_seconds', 'time from time_to_start until the task has started')
+        self.run = registry.histogram('task_run_seconds', 'task execution time')
+        self.completed = registry.counter('tasks_completed', 'tasks completed successfully')
+        self.failed = registry.counter('tasks_failed', 'tasks that raised an error')
+        self.timeouts = registry.counter('tasks_timed_out', 'tasks cancelled by their lifetime')
+        self.rejected = registry.counter('tasks_rejected', 'tasks rejected by the backpressure policy')
+        registry.gauge('scheduled_tasks', 'deferred tasks in the timer heap', lambda: len(service.scheduler))
+        registry.gauge('worker_queue_depth', 'tasks waiting for a worker thread', service.worker_pool.queue_depth)
+        registry.gauge('active_workers', 'worker threads executing a task', service.worker_pool.busy)
+        registry.gauge('hung_workers', 'worker threads still running a task whose lifetime has expired', service.worker_pool.hung)
+        registry.gauge('active_processes', 'worker processes executing a hard task', service.process_pool.busy)
+
+    def __repr__(self) -> str:
+        return f'<ServiceMetrics ({self.registry})>'
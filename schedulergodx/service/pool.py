@@ -0,0 +1,180 @@
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from enum import Enum
+from logging import Logger
+from typing import Any, Callable
+
+from schedulergodx.utils.logger import LoggerConstructor
+
+PoolStats = namedtuple(
+    'PoolStats',
+    'workers busy hung utilisation queue_depth queue_size submitted completed rejected wait_avg wait_max'
+)
+
+
+class BackpressurePolicy(Enum):
+    BLOCK = 0
+    REJECT = 1
+    SPILL = 2
+
+
+class PoolSaturated(Exception):
+    pass
+
+
+class WorkerPool:
+
+    def __init__(self, max_workers: int, max_queue: int, logger: Logger,
+                 policy: BackpressurePolicy = BackpressurePolicy.BLOCK,
+                 name: str = 'worker-pool') -> None:
+        self.name = name
+        self.logger = logger
+        self.max_workers = max_workers
+        self.policy = policy
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._threads: list[threading.Thread] = []
+        self._feeder: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._held = threading.Condition(self._lock)
+        self._overflow: deque = deque()
+        self._on_drained: list[Callable[[], Any]] = []
+        self._stopping = False
+        self._busy = 0
+        self._hung = 0
+        self._submitted = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def __repr__(self) -> str:
+        return f'<WorkerPool (workers: {self.max_workers}, queue: {self._queue.maxsize})>'
+
+    def _logging(self, level: str, message: str, *args) -> None:
+        LoggerConstructor.log(self.logger, level, f'{self.name} - {message}', *args)
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        for i in range(self.max_workers):
+            thread = threading.Thread(target=self._worker, name=f'{self.name}-{i}', daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        if self.policy is BackpressurePolicy.BLOCK:
+            self._stopping = False
+            self._feeder = threading.Thread(target=self._feed, name=f'{self.name}-feeder', daemon=True)
+            self._feeder.start()
+        self._logging('info', f'{self.max_workers} workers have started')
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> None:
+        item = (time.monotonic(), fn, args, kwargs)
+        with self._held:
+            try:
+                if self._overflow:
+                    raise queue.Full
+                self._queue.put_nowait(item)
+            except queue.Full:
+                if self.policy is not BackpressurePolicy.BLOCK:
+                    self._rejected += 1
+                    raise PoolSaturated(f'{self.name} is saturated ({self._queue.maxsize} tasks in backlog)') from None
+                self._overflow.append(item)
+                self._held.notify()
+            self._submitted += 1
+            
+    def when_ready(self, callback: Callable[[], Any]) -> None:
+        with self._held:
+            if self._overflow:
+                return self._on_drained.append(callback)
+        callback()
+            
+    def release_waiters(self) -> None:
+        with self._held:
+            callbacks, self._on_drained = self._on_drained, []
+        for callback in callbacks:
+            callback()
+            
+    def _feed(self) -> None:
+        while True:
+            with self._held:
+                while not self._overflow and not self._stopping:
+                    self._held.wait()
+                if not self._overflow:
+                    return
+                item = self._overflow[0]
+            self._queue.put(item)
+            with self._held:
+                self._overflow.popleft()
+                callbacks = [] if self._overflow else self._on_drained
+                if callbacks:
+                    self._on_drained = []
+            for callback in callbacks:
+                callback()
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            enqueued_at, fn, args, kwargs = item
+            wait = time.monotonic() - enqueued_at
+            with self._lock:
+                self._busy += 1
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                self._logging('error', f'unhandled error in worker: {e}')
+            finally:
+                with self._lock:
+                    self._busy -= 1
+                    self._completed += 1
+
+    def busy(self) -> int:
+        return self._busy
+
+    def hung(self) -> int:
+        return self._hung
+
+    def mark_hung(self, hung: bool = True) -> None:
+        with self._lock:
+            self._hung += 1 if hung else -1
+
+    def holding(self) -> bool:
+        return bool(self._overflow)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() + len(self._overflow)
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            started = self._completed + self._busy
+            return PoolStats(
+                workers = self.max_workers,
+                busy = self._busy,
+                hung = self._hung,
+                utilisation = self._busy / self.max_workers,
+                queue_depth = self._queue.qsize() + len(self._overflow),
+                queue_size = self._queue.maxsize,
+                submitted = self._submitted,
+                completed = self._completed,
+                rejected = self._rejected,
+                wait_avg = self._wait_total / started if started else 0.0,
+                wait_max = self._wait_max
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._held:
+            self._stopping = True
+            self._held.notify()
+        if wait and self._feeder is not None:
+            self._feeder.join()
+        self._feeder = None
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
@@ -0,0 +1,215 @@
+import atexit
+import multiprocessing
+import queue
+import threading
+from collections import OrderedDict
+from logging import Logger
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Optional
+
+import dill
+
+from schedulergodx.utils.logger import LoggerConstructor
+from schedulergodx.utils.message import MessageConstructor, Serializable
+
+
+_MISS = b'miss'
+
+
+class ProcessTaskError(Exception):
+    pass
+
+
+def _worker_main(conn: Connection, cache_size: int = 128) -> None:
+    functions: OrderedDict[str, Callable] = OrderedDict()
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        func_key, func, args_encoding, args, kwargs = job
+        if func is None and func_key not in functions:
+            conn.send_bytes(_MISS)
+            continue
+        try:
+            if func is None:
+                functions.move_to_end(func_key)
+                func = functions[func_key]
+            else:
+                func = MessageConstructor.deserialization(func)
+                if func_key is not None:
+                    functions[func_key] = func
+                    if len(functions) > cache_size:
+                        functions.popitem(last=False)
+            args, kwargs = MessageConstructor.decode_arguments(args_encoding, args, kwargs)
+            result = ('ok', func(*args, **kwargs))
+        except BaseException as e:
+            result = ('error', str(e))
+        try:
+            payload = dill.dumps(result)
+        except Exception as e:
+            payload = dill.dumps(('error', f'the result cannot be serialized: {e}'))
+        conn.send_bytes(payload)
+
+
+class _Worker:
+
+    def __init__(self, context: multiprocessing.context.BaseContext, name: str) -> None:
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), name=name, daemon=False)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+        self.functions: set[str] = set()
+
+    def kill(self) -> None:
+        self.process.terminate()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+    def retire(self) -> None:
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+def default_start_method() -> str:
+    return 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class ProcessPool:
+
+    def __init__(self, processes: int, logger: Logger, max_tasks_per_child: Optional[int] = None,
+                 start_method: Optional[str] = None, name: str = 'process-pool') -> None:
+        self.name = name
+        self.logger = logger
+        self.processes = processes
+        self.max_tasks_per_child = max_tasks_per_child
+        self.start_method = start_method or default_start_method()
+        self._context = multiprocessing.get_context(self.start_method)
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._workers: set[_Worker] = set()
+        self._retired: queue.SimpleQueue = queue.SimpleQueue()
+        self._respawner: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._spawned = 0
+        self._closed = True
+
+    def __repr__(self) -> str:
+        return f'<ProcessPool (processes: {self.processes}, start method: {self.start_method})>'
+
+    def _logging(self, level: str, message: str, *args) -> None:
+        LoggerConstructor.log(self.logger, level, f'{self.name} - {message}', *args)
+
+    def _spawn(self) -> None:
+        with self._lock:
+            self._spawned += 1
+            name = f'{self.name}-{self._spawned}'
+        worker = _Worker(self._context, name)
+        with self._lock:
+            if not self._closed:
+                self._workers.add(worker)
+                return self._idle.put(worker)
+        worker.retire()
+
+    def _replace(self, worker: _Worker, kill: bool = True) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+        self._retired.put((worker, kill))
+        
+    def _respawn(self) -> None:
+        while (item := self._retired.get()) is not None:
+            worker, kill = item
+            worker.kill() if kill else worker.retire()
+            try:
+                self._spawn()
+            except Exception as e:
+                self._logging('error', f'a worker process could not be started: {e}')
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._closed = False
+        self._respawner = threading.Thread(target=self._respawn, name=f'{self.name}-respawner', daemon=True)
+        self._respawner.start()
+        for _ in range(self.processes):
+            self._spawn()
+        atexit.register(self.shutdown)
+        self._logging('info', f'{self.processes} worker processes have started ({self.start_method})')
+
+    def busy(self) -> int:
+        return max(len(self._workers) - self._idle.qsize(), 0)
+
+    def _exchange(self, worker: _Worker, job: tuple, timeout: Optional[float]) -> bytes:
+        func_key = job[0]
+        cached = func_key is not None and func_key in worker.functions
+        worker.conn.send((func_key, None, *job[2:]) if cached else job)
+        if not worker.conn.poll(timeout):
+            raise TimeoutError(f'the task has exceeded {timeout}s')
+        payload = worker.conn.recv_bytes()
+        if payload == _MISS:
+            worker.conn.send(job)
+            if not worker.conn.poll(timeout):
+                raise TimeoutError(f'the task has exceeded {timeout}s')
+            payload = worker.conn.recv_bytes()
+        if func_key is not None:
+            worker.functions.add(func_key)
+        return payload
+
+    def _release(self, worker: _Worker) -> None:
+        worker.tasks += 1
+        if self.max_tasks_per_child and worker.tasks >= self.max_tasks_per_child:
+            self._replace(worker, kill=False)
+        else:
+            self._idle.put(worker)
+
+    def run(self, func: Serializable, args: Serializable, kwargs: Serializable,
+            timeout: Optional[float] = None, func_key: Optional[str] = None, 
+            args_encoding: Optional[str] = None) -> Any:
+        worker = self._idle.get()
+        payload = None
+        try:
+            payload = self._exchange(worker, (func_key, func, args_encoding, args, kwargs), timeout)
+        except TimeoutError:
+            self._logging('info', f'{worker.process.name} was killed after {timeout}s')
+            raise
+        except (EOFError, OSError) as e:
+            worker.process.join(1)
+            raise ProcessTaskError(f'the worker process has exited with code {worker.process.exitcode}: {e}') from None
+        finally:
+            if payload is None:
+                self._replace(worker)
+            else:
+                self._release(worker)
+        try:
+            status, value = dill.loads(payload)
+        except Exception as e:
+            raise ProcessTaskError(f'the result cannot be deserialized: {e}') from None
+        if status == 'error':
+            raise ProcessTaskError(value)
+        return value
+
+    def shutdown(self) -> None:
+        atexit.unregister(self.shutdown)
+        with self._lock:
+            self._closed = True
+        if self._respawner is not None:
+            self._retired.put(None)
+            self._respawner.join()
+            self._respawner = None
+        with self._lock:
+            workers, self._workers = self._workers, set()
+        for worker in workers:
+            worker.retire()
+        self._idle = queue.Queue()
@@ -0,0 +1,63 @@
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import schedulergodx.utils as utils
+from schedulergodx.utils.storage import DB
+
+
+class FunctionRegistry:
+
+    def __init__(self, db: DB, cache_size: int = 256) -> None:
+        self.db = db
+        self.cache_size = cache_size
+        self._hashes: set[str] = set()
+        self._cache: OrderedDict[str, tuple[Callable, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'<FunctionRegistry (functions: {len(self._hashes)}, cached: {len(self._cache)})>'
+
+    def __contains__(self, hash: str) -> bool:
+        if hash in self._hashes:
+            return True
+        with self.db.session() as session:
+            if not self.db.has_function(hash, session):
+                return False
+        self._hashes.add(hash)
+        return True
+
+    def load(self) -> None:
+        with self.db.session() as session:
+            self._hashes = set(self.db.get_function_hashes(session))
+
+    def add(self, hash: str, body: utils.Serializable) -> None:
+        if utils.MessageConstructor.function_hash(body) != hash:
+            raise ValueError(f'the function does not match the hash {hash}')
+        if hash in self._hashes:
+            return
+        with self.db.session() as session:
+            self.db.add_function(hash, utils.MessageConstructor.as_text(body), session)
+        self._hashes.add(hash)
+
+    def _get(self, hash: str) -> tuple[Callable, str]:
+        with self._lock:
+            if hash in self._cache:
+                self._cache.move_to_end(hash)
+                return self._cache[hash]
+        with self.db.session() as session:
+            body = self.db.get_function_body(hash, session)
+        if body is None:
+            raise KeyError(f'unknown function {hash}')
+        entry = (utils.MessageConstructor.deserialization(body), body)
+        with self._lock:
+            self._cache[hash] = entry
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return entry
+
+    def get(self, hash: str) -> Callable:
+        return self._get(hash)[0]
+
+    def get_body(self, hash: str) -> str:
+        return self._get(hash)[1]
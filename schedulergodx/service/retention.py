@@ -0,0 +1,139 @@
+import enum
+import gzip
+import json
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from logging import Logger
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import inspect
+
+from schedulergodx.utils.logger import LoggerConstructor
+from schedulergodx.utils.message import Seconds
+from schedulergodx.utils.storage import DB, TaskStatus
+
+FINISHED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.ERROR, TaskStatus.CANCELLED,
+                     TaskStatus.OVERDUE, TaskStatus.ORPHAN)
+
+
+class ArchiveMode(enum.Enum):
+    NONE = 0
+    TABLE = 1
+    FILE = 2
+
+
+def _row_to_dict(task: DB.Task) -> dict[str, Any]:
+    row = {}
+    for column in inspect(task).mapper.column_attrs:
+        value = getattr(task, column.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, enum.Enum):
+            value = value.name
+        row[column.key] = value
+    return row
+
+
+class Retention:
+
+    def __init__(self, db: DB, ttl: Seconds, logger: Logger,
+                 statuses: Iterable[TaskStatus] = FINISHED_STATUSES, batch_size: int = 500,
+                 interval: Seconds = 60, pause: float = 0.05, archive: ArchiveMode = ArchiveMode.NONE,
+                 archive_path: str = 'SchedulerGodX-archive.jsonl.gz',
+                 compaction_interval: Optional[Seconds] = None, name: str = 'retention') -> None:
+        self.name = name
+        self.db = db
+        self.ttl = ttl
+        self.logger = logger
+        self.statuses = tuple(statuses)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pause = pause
+        self.archive = archive
+        self.archive_path = archive_path
+        self.compaction_interval = compaction_interval
+        self._compacted_at = time.monotonic()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.removed = 0
+
+    def __repr__(self) -> str:
+        return f'<Retention (ttl: {self.ttl}s, archive: {self.archive.name}, removed: {self.removed})>'
+
+    def _logging(self, level: str, message: str, *args) -> None:
+        LoggerConstructor.log(self.logger, level, f'{self.name} - {message}', *args)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self._logging('info', f'retention has started (ttl: {self.ttl}s, archive: {self.archive.name})')
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _archive_file(self, rows: list[dict[str, Any]]) -> None:
+        with gzip.open(self.archive_path, 'at', encoding='utf-8') as file:
+            for row in rows:
+                file.write(json.dumps(row) + '\n')
+
+    def run_batch(self) -> int:
+        before = datetime.now() - timedelta(seconds=self.ttl)
+        with self.db.session() as session:
+            if self.archive is ArchiveMode.NONE:
+                tasks = None
+                ids = self.db.get_finished_task_ids(before, self.statuses, session, limit=self.batch_size)
+            else:
+                tasks = self.db.get_finished_tasks(before, self.statuses, session, limit=self.batch_size)
+                ids = [task.id for task in tasks]
+            if not ids:
+                return 0
+            archive = None
+            if self.archive is ArchiveMode.FILE:
+                self._archive_file([_row_to_dict(task) for task in tasks])
+            elif self.archive is ArchiveMode.TABLE:
+                now = datetime.now()
+                archive = [
+                    {
+                        'id': task.id,
+                        'client': task.client,
+                        'status': task.status,
+                        'time_to_start': task.time_to_start,
+                        'archived_at': now,
+                        'data': zlib.compress(json.dumps(_row_to_dict(task)).encode())
+                    }
+                    for task in tasks
+                ]
+            removed = self.db.delete_tasks(ids, session, archive=archive)
+        self.removed += removed
+        return removed
+
+    def _compact(self) -> None:
+        if (self.compaction_interval is None
+            or time.monotonic() - self._compacted_at < self.compaction_interval):
+            return
+        started = time.monotonic()
+        self.db.compact()
+        self._compacted_at = time.monotonic()
+        self._logging('info', f'the database was compacted in {self._compacted_at - started:.2f}s')
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                removed = self.run_batch()
+                if removed:
+                    self._logging('debug', f'{removed} finished tasks were removed')
+                if removed >= self.batch_size:
+                    self._stopped.wait(self.pause)
+                    continue
+                self._compact()
+            except Exception as e:
+                self._logging('error', f'retention failed: {e}')
+            self._stopped.wait(self.interval)
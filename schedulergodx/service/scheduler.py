@@ -0,0 +1,128 @@
+import heapq
+import itertools
+import threading
+import time
+from logging import Logger
+from typing import Any, Callable, Hashable, Iterable
+
+from schedulergodx.utils.logger import LoggerConstructor
+
+Dispatch = Callable[[Callable[[], Any]], Any]
+
+
+class Scheduler:
+    _COMPACT_THRESHOLD = 1024
+
+    def __init__(self, logger: Logger, dispatch: Dispatch | None = None, 
+                 name: str = 'scheduler') -> None:
+        self.name = name
+        self.logger = logger
+        self._dispatch = dispatch
+        self._heap: list[list] = []
+        self._entries: dict[Hashable, list] = {}
+        self._cancelled = 0
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def _logging(self, level: str, message: str, *args) -> None:
+        LoggerConstructor.log(self.logger, level, f'{self.name} - {message}', *args)
+
+    def push(self, key: Hashable, when: float, callback: Callable[[], Any]) -> bool:
+        with self._condition:
+            if key in self._entries:
+                return False
+            entry = [when, next(self._counter), key, callback]
+            self._entries[key] = entry
+            heapq.heappush(self._heap, entry)
+            if self._heap[0] is entry:
+                self._condition.notify()
+        return True
+
+    def push_many(self, entries: Iterable[tuple[Hashable, float, Callable[[], Any]]]) -> int:
+        with self._condition:
+            head = self._heap[0] if self._heap else None
+            new = []
+            for key, when, callback in entries:
+                if key in self._entries:
+                    continue
+                entry = [when, next(self._counter), key, callback]
+                self._entries[key] = entry
+                new.append(entry)
+            if len(new) > len(self._heap):
+                self._heap.extend(new)
+                heapq.heapify(self._heap)
+            else:
+                for entry in new:
+                    heapq.heappush(self._heap, entry)
+            if self._heap and self._heap[0] is not head:
+                self._condition.notify()
+        return len(new)
+
+    def cancel(self, key: Hashable) -> bool:
+        with self._condition:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            entry[-1] = None
+            self._cancelled += 1
+            if (self._cancelled > self._COMPACT_THRESHOLD
+                and self._cancelled > len(self._heap) // 2):
+                self._heap = [entry for entry in self._heap if entry[-1] is not None]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+        return True
+
+    def _pop_due(self) -> Callable[[], Any] | None:
+        with self._condition:
+            while self._running:
+                while self._heap and self._heap[0][-1] is None:
+                    heapq.heappop(self._heap)
+                    self._cancelled -= 1
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                _, _, key, callback = heapq.heappop(self._heap)
+                del self._entries[key]
+                return callback
+        return None
+
+    def _run(self) -> None:
+        while True:
+            callback = self._pop_due()
+            if callback is None:
+                return
+            try:
+                if self._dispatch is None:
+                    callback()
+                else:
+                    self._dispatch(callback)
+            except Exception as e:
+                self._logging('error', f'dispatch failed: {e}')
+
+    def start(self) -> None:
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        self._logging('info', 'dispatcher has started')
+
+    def stop(self, timeout: float | None = None) -> None:
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
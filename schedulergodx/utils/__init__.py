@@ -3,12 +3,21 @@ __version__ = '1.0.0'
 
 from schedulergodx.utils.abstractions import (AbstractionConnectClass,
                                               AbstractionCore)
+from schedulergodx.utils.codec import (BINARY_CODEC, JSON_CODEC, BinaryCodec,
+                                       Codec, CodecError, JsonCodec, get_codec)
 from schedulergodx.utils.id_generators import (MessageId, autoincrement,
                                                ulid_generator)
 from schedulergodx.utils.logger import LoggerConstructor
-from schedulergodx.utils.message import (Message, MessageConstructor,
+from schedulergodx.utils.memory_broker import MemoryBroker, MemoryConnect
+from schedulergodx.utils.message import (ArgumentsEncoding, Message,
+                                         MessageConstructor,
                                          MessageDisassemble,
                                          MessageErrorStatus, MessageInfoStatus,
                                          Seconds, Serializable)
+from schedulergodx.utils.metrics import (Counter, Gauge, Histogram,
+                                         MetricsRegistry)
+from schedulergodx.utils.publisher import PublishError, Publisher
 from schedulergodx.utils.rmq_property import RmqConnect, rmq_default_settings
-from schedulergodx.utils.storage import DB, TaskStatus
+from schedulergodx.utils.storage import (DB, Durability, PostgresDB, SqliteDB,
+                                         TaskStatus, WriteBuffer)
+from schedulergodx.utils.transport import Transport
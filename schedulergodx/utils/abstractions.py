@@ -4,27 +4,37 @@ from functools import cached_property
 from logging import Logger
 from typing import Any, Generator, NoReturn
 
+from pika.channel import Channel
+
 from schedulergodx.utils.id_generators import MessageId, ulid_generator
 from schedulergodx.utils.logger import LoggerConstructor
 from schedulergodx.utils.rmq_property import RmqConnect, rmq_default_settings
+from schedulergodx.utils.transport import Transport
 
 
 class AbstractionConnectClass(ABC):
     
-    def __init__(self, name: str, *, rmq_que: str, logger: Logger, rmq_connect: RmqConnect) -> None:
+    def __init__(self, name: str, *, rmq_que: str, logger: Logger, rmq_connect: Transport) -> None:
         self.name = name
         self.logger = logger
         self.queue = rmq_que
-        self.channel = rmq_connect.get_channel(rmq_que)
+        self.rmq_connect = rmq_connect
+        self._channel: Channel | None = None
+        
+    @property
+    def channel(self) -> Channel:
+        if self._channel is None or not self._channel.is_open:
+            self._channel = self.rmq_connect.get_channel(self.queue)
+        return self._channel
         
-    def _logging(self, level: str, message: str) -> None:
-        LoggerConstructor.log_levels(self.logger)[level](f'{self.name} - {message}')
+    def _logging(self, level: str, message: str, *args) -> None:
+        LoggerConstructor.log(self.logger, level, f'{self.name} - {message}', *args)
         
 
 @dataclass
 class AbstractionCore(ABC):    
     core_name: str = 'core'
-    rmq_connect: RmqConnect = RmqConnect(
+    rmq_connect: Transport = RmqConnect(
         rmq_parameters=rmq_default_settings.parametrs,
         rmq_credentials=rmq_default_settings.credentials
     )
@@ -45,5 +55,5 @@ class AbstractionCore(ABC):
     def logger(self) -> Logger:
         ''' '''
     
-    def _logging(self, level: str, message: str) -> None:
-        LoggerConstructor.log_levels(self.logger)[level](f'{self.core_name} - {message}')
\ No newline at end of file
+    def _logging(self, level: str, message: str, *args) -> None:
+        LoggerConstructor.log(self.logger, level, f'{self.core_name} - {message}', *args)
\ No newline at end of file
@@ -0,0 +1,108 @@
+import base64
+import json
+import struct
+from abc import ABC, abstractmethod
+from typing import Any, Mapping
+
+
+class CodecError(ValueError):
+    pass
+
+
+class Codec(ABC):
+    content_type: str
+
+    def __repr__(self) -> str:
+        return f'<{type(self).__name__} ({self.content_type})>'
+
+    @abstractmethod
+    def encode(self, data: Mapping) -> bytes:
+        ''' '''
+
+    @abstractmethod
+    def decode(self, body: bytes | str) -> dict:
+        ''' '''
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode('utf-8')
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+class JsonCodec(Codec):
+    content_type = 'application/json'
+
+    def encode(self, data: Mapping) -> bytes:
+        return json.dumps(data, default=_json_default).encode('utf-8')
+
+    def decode(self, body: bytes | str) -> dict:
+        return json.loads(body)
+
+
+class BinaryCodec(Codec):
+    content_type = 'application/x-schedulergodx'
+    MAGIC = b'SGDX'
+    VERSION = 2
+    _header = struct.Struct('!4sBI')
+    _length = struct.Struct('!I')
+    _reference = '__bytes__'
+
+    def encode(self, data: Mapping) -> bytes:
+        segments: list[bytes] = []
+
+        def reference(value: Any) -> dict:
+            if isinstance(value, (bytes, bytearray, memoryview)):
+                segments.append(value)
+                return {self._reference: len(segments) - 1}
+            raise TypeError(f'{type(value).__name__} is not serializable')
+
+        document = json.dumps(data, default=reference, separators=(',', ':')).encode('utf-8')
+        parts = [self._header.pack(self.MAGIC, self.VERSION, len(document)), document]
+        for segment in segments:
+            parts.append(self._length.pack(len(segment)))
+            parts.append(segment)
+        return b''.join(parts)
+
+    def decode(self, body: bytes | str) -> dict:
+        if isinstance(body, str) or len(body) < self._header.size:
+            raise CodecError('the message is not a binary envelope')
+        magic, version, size = self._header.unpack_from(body)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise CodecError(f'unsupported binary envelope ({magic!r}, version {version})')
+        view = memoryview(body)
+        offset = self._header.size + size
+        segments = []
+        try:
+            while offset < len(view):
+                (length,) = self._length.unpack_from(view, offset)
+                offset += self._length.size
+                if offset + length > len(view):
+                    raise CodecError('a segment is truncated')
+                segments.append(bytes(view[offset:offset + length]))
+                offset += length
+
+            def resolve(value: dict) -> Any:
+                if len(value) == 1 and self._reference in value:
+                    return segments[value[self._reference]]
+                return value
+
+            return json.loads(view[self._header.size:self._header.size + size].tobytes(), object_hook=resolve if segments else None)
+        except CodecError:
+            raise
+        except Exception as e:
+            raise CodecError(f'the binary envelope is corrupted: {e}') from e
+
+
+JSON_CODEC = JsonCodec()
+BINARY_CODEC = BinaryCodec()
+CODECS: dict[str, Codec] = {codec.content_type: codec for codec in (JSON_CODEC, BINARY_CODEC)}
+
+
+def get_codec(content_type: str | None) -> Codec:
+    if content_type is None:
+        return JSON_CODEC
+    try:
+        return CODECS[content_type]
+    except KeyError:
+        raise CodecError(f'unsupported content type {content_type}') from None
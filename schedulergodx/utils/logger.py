@@ -1,21 +1,64 @@
+import atexit
 import logging
 import logging.config
-from logging import Logger, FileHandler, Formatter
+import os
+import queue
+import threading
+from logging import FileHandler, Formatter, Logger
+from logging.handlers import QueueHandler, QueueListener
 from typing import Callable
 
+LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'error': logging.ERROR,
+    'critical': logging.CRITICAL,
+    'fatal': logging.FATAL
+}
+
+_listeners: dict[str, tuple[QueueHandler, QueueListener]] = {}
+_listeners_lock = threading.Lock()
+
+
+class _RecordQueueHandler(QueueHandler):
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _queue_handler(log_file: str) -> QueueHandler:
+    path = os.path.abspath(log_file)
+    with _listeners_lock:
+        if path not in _listeners:
+            records = queue.SimpleQueue()
+            file_handler = FileHandler(path)
+            file_handler.setFormatter(Formatter('%(asctime)s - %(levelname)s - %(name)s:%(message)s'))
+            listener = QueueListener(records, file_handler, respect_handler_level=True)
+            listener.start()
+            _listeners[path] = (_RecordQueueHandler(records), listener)
+        return _listeners[path][0]
+
+
+@atexit.register
+def _stop_listeners() -> None:
+    with _listeners_lock:
+        for handler, listener in _listeners.values():
+            listener.stop()
+            for file_handler in listener.handlers:
+                file_handler.close()
+        _listeners.clear()
+
 
 class LoggerConstructor:
-    
-    def __init__(self, name: str = 'logger', log_file: str = 'schedulergodx.log', 
+
+    def __init__(self, name: str = 'logger', log_file: str = 'schedulergodx.log',
                  log_level: int = logging.INFO) -> None:
        self.logger = logging.getLogger(name)
        self.logger.setLevel(log_level)
-       file_handler = FileHandler(log_file)
-       file_handler.setLevel(log_level)
-       formatter = Formatter('%(asctime)s - %(levelname)s - %(name)s:%(message)s')
-       file_handler.setFormatter(formatter)       
-       self.logger.addHandler(file_handler)
-    
+       handler = _queue_handler(log_file)
+       if handler not in self.logger.handlers:
+           self.logger.addHandler(handler)
+
     @staticmethod
     def log_levels(logger: Logger) -> dict[str, Callable]:
         return {
@@ -25,12 +68,18 @@ class LoggerConstructor:
             'critical': logger.critical,
             'fatal': logger.fatal
         }
-        
+
+    @staticmethod
+    def log(logger: Logger, level: str, message: str, *args) -> None:
+        levelno = LEVELS[level]
+        if logger.isEnabledFor(levelno):
+            logger.log(levelno, message, *args)
+
     def addHandler(self, hdlr: logging.Handler) -> None:
        self.logger.addHandler(hdlr=hdlr)
-    
+
     def addFilter(self, filter: logging.Filter) -> None:
         self.logger.addFilter(filter)
-        
+
     def getLogger(self) -> Logger:
-        return self.logger
\ No newline at end of file
+        return self.logger
@@ -0,0 +1,256 @@
+import itertools
+import threading
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Callable, Optional
+
+from pika.exceptions import ChannelClosedByClient
+from pika.spec import Basic, BasicProperties, Confirm, Queue
+
+from schedulergodx.utils.transport import Transport
+
+Frame = namedtuple('Frame', 'method')
+
+
+class MemoryBroker:
+
+    def __init__(self, delivery_batch: int = 64) -> None:
+        self.delivery_batch = delivery_batch
+        self._queues: defaultdict[str, deque] = defaultdict(deque)
+        self._condition = threading.Condition()
+
+    def __repr__(self) -> str:
+        return f'<MemoryBroker (queues: {len(self._queues)})>'
+
+    def declare(self, queue: str) -> None:
+        with self._condition:
+            self._queues[queue]
+
+    def depth(self, queue: str) -> int:
+        return len(self._queues[queue])
+
+    def put(self, queue: str, body: bytes, properties: BasicProperties, front: bool = False) -> None:
+        with self._condition:
+            if front:
+                self._queues[queue].appendleft((body, properties))
+            else:
+                self._queues[queue].append((body, properties))
+            self._condition.notify_all()
+
+    def _get(self, queue: str) -> Optional[tuple[bytes, BasicProperties]]:
+        with self._condition:
+            messages = self._queues[queue]
+            return messages.popleft() if messages else None
+
+
+class MemoryChannel:
+
+    def __init__(self, connection: 'MemoryConnection', number: int) -> None:
+        self.connection = connection
+        self.channel_number = number
+        self.is_open = True
+        self._broker = connection.broker
+        self._consumers: dict[str, tuple[str, Callable]] = {}
+        self._consumer_tags = itertools.count(1)
+        self._prefetch_count = 0
+        self._delivery_tag = 0
+        self._unacked: dict[int, tuple[str, bytes, BasicProperties]] = {}
+        self._on_confirm: Optional[Callable] = None
+        self._on_close: list[Callable] = []
+        self._publish_tag = 0
+
+    def __repr__(self) -> str:
+        return f'<MemoryChannel {self.channel_number} (unacked: {len(self._unacked)})>'
+
+    @property
+    def is_closed(self) -> bool:
+        return not self.is_open
+
+    @property
+    def is_closing(self) -> bool:
+        return False
+
+    def _reply(self, callback: Optional[Callable], method: Any) -> None:
+        if callback is not None:
+            self.connection.call_soon(partial(callback, Frame(method)))
+
+    def add_on_close_callback(self, callback: Callable) -> None:
+        self._on_close.append(callback)
+
+    def queue_declare(self, queue: str, durable: bool = False, callback: Optional[Callable] = None, 
+                      **kwargs) -> None:
+        self._broker.declare(queue)
+        self._reply(callback, Queue.DeclareOk(queue=queue))
+
+    def basic_qos(self, prefetch_count: int = 0, callback: Optional[Callable] = None, **kwargs) -> None:
+        self._prefetch_count = prefetch_count
+        self._reply(callback, Basic.QosOk())
+
+    def confirm_delivery(self, ack_nack_callback: Callable, callback: Optional[Callable] = None) -> None:
+        self._on_confirm = ack_nack_callback
+        self._reply(callback, Confirm.SelectOk())
+
+    def basic_publish(self, exchange: str, routing_key: str, body: bytes,
+                      properties: Optional[BasicProperties] = None, mandatory: bool = False) -> None:
+        self._broker.put(routing_key, body, properties or BasicProperties())
+        if self._on_confirm is not None:
+            self._publish_tag += 1
+            self._reply(self._on_confirm, Basic.Ack(delivery_tag=self._publish_tag))
+
+    def basic_consume(self, queue: str, on_message_callback: Callable, auto_ack: bool = False, 
+                      callback: Optional[Callable] = None, **kwargs) -> str:
+        consumer_tag = f'ctag{self.channel_number}.{next(self._consumer_tags)}'
+        self._consumers[consumer_tag] = (queue, on_message_callback)
+        self._reply(callback, Basic.ConsumeOk(consumer_tag=consumer_tag))
+        return consumer_tag
+
+    def basic_cancel(self, consumer_tag: str = '', callback: Optional[Callable] = None) -> None:
+        self._consumers.pop(consumer_tag, None)
+        self._reply(callback, Basic.CancelOk(consumer_tag=consumer_tag))
+
+    def basic_ack(self, delivery_tag: int = 0, multiple: bool = False) -> None:
+        if multiple:
+            for tag in [tag for tag in self._unacked if tag <= delivery_tag]:
+                del self._unacked[tag]
+        else:
+            self._unacked.pop(delivery_tag, None)
+
+    def basic_nack(self, delivery_tag: int = 0, multiple: bool = False, requeue: bool = True) -> None:
+        tags = [tag for tag in self._unacked if tag <= delivery_tag] if multiple else [delivery_tag]
+        for tag in reversed(tags):
+            queue, body, properties = self._unacked.pop(tag)
+            if requeue:
+                self._broker.put(queue, body, properties, front=True)
+
+    def close(self, reply_code: int = 200, reply_text: str = 'Normal shutdown') -> None:
+        if not self.is_open:
+            return
+        self.is_open = False
+        self._consumers.clear()
+        self.basic_nack(self._delivery_tag, multiple=True, requeue=True)
+        reason = ChannelClosedByClient(reply_code, reply_text)
+        for callback in self._on_close:
+            self.connection.call_soon(partial(callback, self, reason))
+
+    def _can_deliver(self) -> bool:
+        if not self._consumers or (self._prefetch_count and len(self._unacked) >= self._prefetch_count):
+            return False
+        return any(self._broker.depth(queue) for queue, _ in self._consumers.values())
+
+    def _deliver(self) -> int:
+        delivered = 0
+        for consumer_tag, (queue, callback) in list(self._consumers.items()):
+            while delivered < self._broker.delivery_batch and self.is_open:
+                if self._prefetch_count and len(self._unacked) >= self._prefetch_count:
+                    return delivered
+                message = self._broker._get(queue)
+                if message is None:
+                    break
+                body, properties = message
+                self._delivery_tag += 1
+                self._unacked[self._delivery_tag] = (queue, body, properties)
+                method = Basic.Deliver(consumer_tag=consumer_tag, delivery_tag=self._delivery_tag, routing_key=queue)
+                callback(self, method, properties, body)
+                delivered += 1
+        return delivered
+
+
+class MemoryConnection:
+
+    def __init__(self, broker: MemoryBroker) -> None:
+        self.broker = broker
+        self.is_open = True
+        self._channels: list[MemoryChannel] = []
+        self._callbacks: deque[Callable[[], Any]] = deque()
+        self._numbers = itertools.count(1)
+
+    def __repr__(self) -> str:
+        return f'<MemoryConnection (channels: {len(self._channels)})>'
+
+    @property
+    def is_closed(self) -> bool:
+        return not self.is_open
+
+    def channel(self, on_open_callback: Optional[Callable] = None) -> MemoryChannel:
+        channel = MemoryChannel(self, next(self._numbers))
+        self._channels.append(channel)
+        if on_open_callback is not None:
+            self.call_soon(partial(on_open_callback, channel))
+        return channel
+
+    def call_soon(self, callback: Callable[[], Any]) -> None:
+        with self.broker._condition:
+            self._callbacks.append(callback)
+            self.broker._condition.notify_all()
+
+    def _pending(self) -> bool:
+        return bool(self._callbacks) or any(channel._can_deliver() for channel in self._channels)
+
+    def process_data_events(self, timeout: Optional[float] = None) -> None:
+        with self.broker._condition:
+            if not self._pending():
+                self.broker._condition.wait(timeout)
+            callbacks, self._callbacks = self._callbacks, deque()
+        for callback in callbacks:
+            callback()
+        self._channels = [channel for channel in self._channels if channel.is_open]
+        for channel in self._channels:
+            channel._deliver()
+
+    def close(self) -> None:
+        for channel in self._channels:
+            channel.close()
+        self.is_open = False
+
+
+class MemoryConnect(Transport):
+
+    def __init__(self, broker: Optional[MemoryBroker] = None) -> None:
+        self.broker = broker if broker is not None else MemoryBroker()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._connection: MemoryConnection | None = None
+
+    def __repr__(self) -> str:
+        return f'<MemoryConnect ({self.broker})>'
+
+    def _start(self) -> MemoryConnection:
+        with self._lock:
+            if self._thread is None:
+                self._connection = MemoryConnection(self.broker)
+                self._thread = threading.Thread(target=self._run, args=(self._connection,), 
+                                                name='memory-io', daemon=True)
+                self._thread.start()
+            return self._connection
+
+    @staticmethod
+    def _run(connection: MemoryConnection) -> None:
+        while connection.is_open or connection._callbacks:
+            connection.process_data_events(timeout=1)
+
+    def in_io_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def call_soon(self, callback: Callable[[], Any]) -> None:
+        self._start().call_soon(callback)
+
+    def open_channel(self, queue: str) -> Future:
+        future = Future()
+
+        def on_open(channel: MemoryChannel) -> None:
+            channel.queue_declare(queue=queue, durable=True, callback=lambda frame: future.set_result(channel))
+
+        connection = self._start()
+        connection.call_soon(lambda: connection.channel(on_open_callback=on_open))
+        return future
+
+    def close(self) -> None:
+        with self._lock:
+            thread, connection = self._thread, self._connection
+            self._thread = self._connection = None
+        if thread is None:
+            return
+        connection.call_soon(connection.close)
+        if thread is not threading.current_thread():
+            thread.join()
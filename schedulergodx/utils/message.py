@@ -1,12 +1,17 @@
 import base64
+import hashlib
 import json
+import pickle
 from collections import namedtuple
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
 from enum import Enum
-from typing import Callable, Iterable, Mapping, Optional, TypeAlias
+from typing import Any, Callable, Iterable, Mapping, Optional, TypeAlias
+from uuid import UUID
 
 import dill
 
+from schedulergodx.utils.codec import get_codec
 from schedulergodx.utils.id_generators import MessageId
 
 Serializable : TypeAlias = str | bytes | bytearray
@@ -19,6 +24,9 @@ class Message(Enum):
     INFO = 1
     ERROR = 2
     TASK = 3
+    TASK_BATCH = 4
+    FUNCTION = 5
+    RESULT = 6
     
     
 class MessageInfoStatus(Enum):
@@ -32,22 +40,144 @@ class MessageErrorStatus(Enum):
     INVALID_TASK = 3
     ERROR_IN_TASK = 4
     TASK_TIMEOT_ERROR = 5
+    SERVICE_OVERLOADED = 6
+    UNKNOWN_FUNCTION = 7
+    RESULT_NOT_FOUND = 8
     
     
+class ArgumentsEncoding(Enum):
+    JSON = 'json'
+    PICKLE = 'pickle'
+    DILL = 'dill'
+    
+    
+_JSON_SCALARS = frozenset((str, int, float, bool, type(None)))
+_PICKLE_SCALARS = frozenset((bytes, bytearray, complex, date, datetime, time, timedelta, Decimal, UUID))
+_ENCODING_RANK = {ArgumentsEncoding.JSON: 0, ArgumentsEncoding.PICKLE: 1, ArgumentsEncoding.DILL: 2}
+
+
+def _max_encoding(values: Iterable, encoding: ArgumentsEncoding) -> ArgumentsEncoding:
+    for value in values:
+        value_encoding = _value_encoding(value)
+        if _ENCODING_RANK[value_encoding] > _ENCODING_RANK[encoding]:
+            encoding = value_encoding
+            if encoding is ArgumentsEncoding.DILL:
+                break
+    return encoding
+
+
+def _value_encoding(value: Any) -> ArgumentsEncoding:
+    type_ = type(value)
+    if type_ in _JSON_SCALARS:
+        return ArgumentsEncoding.JSON
+    if type_ is list:
+        return _max_encoding(value, ArgumentsEncoding.JSON)
+    if type_ is dict:
+        if all(type(key) is str for key in value):
+            return _max_encoding(value.values(), ArgumentsEncoding.JSON)
+        return _max_encoding((*value, *value.values()), ArgumentsEncoding.PICKLE)
+    if type_ in (tuple, set, frozenset):
+        return _max_encoding(value, ArgumentsEncoding.PICKLE)
+    if type_ in _PICKLE_SCALARS:
+        return ArgumentsEncoding.PICKLE
+    return ArgumentsEncoding.DILL
+    
+
 class MessageConstructor:
     
     @staticmethod
     def serialization(object: object) -> Serializable:
         return base64.b64encode(dill.dumps(object)).decode('utf-8')
     
+    @staticmethod
+    def dumps(object: object) -> bytes:
+        return dill.dumps(object)
+    
     @staticmethod
     def deserialization(object: Serializable) -> object:
+        if isinstance(object, (bytes, bytearray)):
+            return dill.loads(object)
         return dill.loads(base64.b64decode(object))
     
+    @staticmethod
+    def as_text(object: Serializable) -> str:
+        if isinstance(object, (bytes, bytearray)):
+            return base64.b64encode(object).decode('utf-8')
+        return object
+    
     @staticmethod 
     def bulk_deserialization(*args: Iterable):
         return map(MessageConstructor.deserialization, args)
     
+    @staticmethod
+    def arguments_encoding(args: Iterable, kwargs: Mapping) -> ArgumentsEncoding:
+        return _max_encoding((*args, *kwargs.values()), ArgumentsEncoding.JSON)
+    
+    @staticmethod
+    def encode_arguments(args: Iterable, kwargs: Mapping) -> tuple[ArgumentsEncoding, Any, Any]:
+        encoding = MessageConstructor.arguments_encoding(args, kwargs)
+        if encoding is ArgumentsEncoding.JSON:
+            return encoding, list(args), dict(kwargs)
+        if encoding is ArgumentsEncoding.PICKLE:
+            return encoding, pickle.dumps(tuple(args), protocol=5), pickle.dumps(dict(kwargs), protocol=5)
+        return encoding, MessageConstructor.dumps(args), MessageConstructor.dumps(kwargs)
+    
+    @staticmethod
+    def store_arguments(encoding: Optional[str], arguments: Any) -> str:
+        if encoding == ArgumentsEncoding.JSON.value:
+            return json.dumps(arguments)
+        return MessageConstructor.as_text(arguments)
+    
+    @staticmethod
+    def decode_arguments(encoding: Optional[str], args: Any, kwargs: Any) -> tuple[tuple, dict]:
+        if encoding == ArgumentsEncoding.JSON.value:
+            if isinstance(args, str):
+                args, kwargs = json.loads(args), json.loads(kwargs)
+            return tuple(args), kwargs
+        if encoding == ArgumentsEncoding.PICKLE.value:
+            return tuple(
+                pickle.loads(value if isinstance(value, (bytes, bytearray)) else base64.b64decode(value))
+                for value in (args, kwargs)
+            )
+        return tuple(MessageConstructor.bulk_deserialization(args, kwargs))
+    
+    @staticmethod
+    def encode_result(value: Any) -> tuple[ArgumentsEncoding, bytes]:
+        encoding = _value_encoding(value)
+        if encoding is ArgumentsEncoding.JSON:
+            return encoding, json.dumps(value).encode('utf-8')
+        if encoding is ArgumentsEncoding.PICKLE:
+            return encoding, pickle.dumps(value, protocol=5)
+        return encoding, MessageConstructor.dumps(value)
+    
+    @staticmethod
+    def result_payload(encoding: str, data: bytes) -> Any:
+        if encoding == ArgumentsEncoding.JSON.value:
+            return json.loads(data)
+        return data
+    
+    @staticmethod
+    def decode_result(encoding: str, result: Any) -> Any:
+        if encoding == ArgumentsEncoding.JSON.value:
+            return result
+        if isinstance(result, str):
+            result = base64.b64decode(result)
+        if encoding == ArgumentsEncoding.PICKLE.value:
+            return pickle.loads(result)
+        return dill.loads(result)
+    
+    @staticmethod
+    def function_hash(function: Serializable) -> str:
+        if isinstance(function, str):
+            function = base64.b64decode(function)
+        return hashlib.sha256(function).hexdigest()
+    
+    @staticmethod
+    def function_arguments(func: Optional[Callable], function_hash: Optional[str]) -> dict:
+        if function_hash:
+            return {'function_hash': function_hash}
+        return {'function': MessageConstructor.dumps(func)}
+    
     @staticmethod
     def initialization(id: MessageId, client: str, **arguments) -> dict:
         return {
@@ -80,33 +210,102 @@ class MessageConstructor:
         }
     
     @staticmethod
-    def task(id: MessageId, client: str, lifetime: int, 
-            func: Callable, func_args: Iterable, func_kwargs: Mapping, 
-            delay: Optional[Seconds] = None, hard: bool = False) -> dict: 
+    def load_time_to_start(time_to_start: datetime | float | Serializable) -> datetime:
+        if isinstance(time_to_start, datetime):
+            return time_to_start
+        if isinstance(time_to_start, (int, float)):
+            return datetime.fromtimestamp(time_to_start)
+        return MessageConstructor.deserialization(time_to_start)
+    
+    @staticmethod
+    def get_time_to_start(delay: Optional[Seconds] = None) -> datetime:
         if delay:
-            time_to_start = timedelta(seconds=delay) + datetime.now()
-        else: 
-            time_to_start = datetime.now()
+            return timedelta(seconds=delay) + datetime.now()
+        return datetime.now()
+    
+    @staticmethod
+    def function(id: MessageId, client: str, hash: str, 
+                 function: Optional[Serializable] = None) -> dict:
+        arguments = {'hash': hash}
+        if function is not None:
+            arguments['function'] = function
+        return {
+            'id': id,
+            'client': client,
+            'type': Message.FUNCTION.value,
+            'arguments': arguments
+        }
+    
+    @staticmethod
+    def result(id: MessageId, client: str, task_id: MessageId) -> dict:
+        return {
+            'id': id,
+            'client': client,
+            'type': Message.RESULT.value,
+            'arguments': {'task_id': task_id}
+        }
+    
+    @staticmethod
+    def task(id: MessageId, client: str, lifetime: int, 
+            func: Optional[Callable], func_args: Iterable, func_kwargs: Mapping, 
+            delay: Optional[Seconds] = None, hard: bool = False, 
+            function_hash: Optional[str] = None) -> dict: 
+        time_to_start = MessageConstructor.get_time_to_start(delay)
+        encoding, args, kwargs = MessageConstructor.encode_arguments(func_args, func_kwargs)
         return {
             'id': id,
             'client': client,
             'type': Message.TASK.value,
             'arguments': {
                 'lifetime': lifetime,
-                'function': MessageConstructor.serialization(func),
-                'args': MessageConstructor.serialization(func_args),
-                'kwargs': MessageConstructor.serialization(func_kwargs),
-                'time_to_start': MessageConstructor.serialization(time_to_start),
+                **MessageConstructor.function_arguments(func, function_hash),
+                'args': args,
+                'kwargs': kwargs,
+                'encoding': encoding.value,
+                'time_to_start': time_to_start.timestamp(),
                 'hard': hard
             }
         }
     
     @staticmethod
-    def disassemble(message: dict | Serializable) -> MessageDisassemble:
-        try:
-            body = json.loads(message)
-        except TypeError:
+    def batch_item(id: MessageId, func_args: Iterable, func_kwargs: Mapping) -> dict:
+        encoding, args, kwargs = MessageConstructor.encode_arguments(func_args, func_kwargs)
+        return {
+            'id': id,
+            'args': args,
+            'kwargs': kwargs,
+            'encoding': encoding.value
+        }
+    
+    @staticmethod
+    def task_batch(id: MessageId, client: str, lifetime: int, func: Optional[Callable], 
+                   tasks: Iterable[tuple[MessageId, Iterable, Mapping]],
+                   delay: Optional[Seconds] = None, hard: bool = False, 
+                   function_hash: Optional[str] = None) -> dict: 
+        time_to_start = MessageConstructor.get_time_to_start(delay)
+        return {
+            'id': id,
+            'client': client,
+            'type': Message.TASK_BATCH.value,
+            'arguments': {
+                'lifetime': lifetime,
+                **MessageConstructor.function_arguments(func, function_hash),
+                'time_to_start': time_to_start.timestamp(),
+                'hard': hard,
+                'tasks': [
+                    MessageConstructor.batch_item(task_id, func_args, func_kwargs)
+                    for task_id, func_args, func_kwargs in tasks
+                ]
+            }
+        }
+    
+    @staticmethod
+    def disassemble(message: Mapping | Serializable, 
+                    content_type: Optional[str] = None) -> MessageDisassemble:
+        if isinstance(message, Mapping):
             body = message
+        else:
+            body = get_codec(content_type).decode(message)
         metadata = {
             'id': body['id'],
             'client': body['client'],
@@ -0,0 +1,185 @@
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterable, Optional
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str = '') -> None:
+        self.name = name if name.endswith('_total') else f'{name}_total'
+        self.help = help
+        self._lock = threading.Lock()
+        self._value = 0.0
+
+    def __repr__(self) -> str:
+        return f'<Counter {self.name} ({self._value})>'
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def samples(self) -> Iterable[tuple[str, float]]:
+        yield self.name, self._value
+
+
+class Gauge:
+    kind = 'gauge'
+
+    def __init__(self, name: str, help: str = '', func: Optional[Callable[[], float]] = None) -> None:
+        self.name = name
+        self.help = help
+        self._func = func
+        self._value = 0.0
+
+    def __repr__(self) -> str:
+        return f'<Gauge {self.name} ({self.value})>'
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        return self._func() if self._func is not None else self._value
+
+    def samples(self) -> Iterable[tuple[str, float]]:
+        yield self.name, self.value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str = '', buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+
+    def __repr__(self) -> str:
+        return f'<Histogram {self.name} (count: {self._count})>'
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def quantile(self, q: float) -> float:
+        with self._lock:
+            counts, total = list(self._counts), self._count
+        if not total:
+            return 0.0
+        rank = q * total
+        for bound, cumulative in zip(self.buckets, _cumulative(counts)):
+            if cumulative >= rank:
+                return bound
+        return float('inf')
+
+    def samples(self) -> Iterable[tuple[str, float]]:
+        with self._lock:
+            counts, total, sum_ = list(self._counts), self._count, self._sum
+        for bound, cumulative in zip(self.buckets, _cumulative(counts)):
+            yield f'{self.name}_bucket{{le="{bound}"}}', cumulative
+        yield f'{self.name}_bucket{{le="+Inf"}}', total
+        yield f'{self.name}_sum', sum_
+        yield f'{self.name}_count', total
+
+
+def _cumulative(counts: list[int]) -> Iterable[int]:
+    total = 0
+    for count in counts:
+        total += count
+        yield total
+
+
+class MetricsRegistry:
+
+    def __init__(self, prefix: str = 'schedulergodx') -> None:
+        self.prefix = prefix
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def __repr__(self) -> str:
+        return f'<MetricsRegistry ({self.prefix}, metrics: {len(self._metrics)})>'
+
+    def __getitem__(self, name: str) -> Counter | Gauge | Histogram:
+        return self._metrics[f'{self.prefix}_{name}']
+
+    def _register(self, cls: type, name: str, *args, **kwargs) -> Counter | Gauge | Histogram:
+        name = f'{self.prefix}_{name}'
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, *args, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name: str, help: str = '') -> Counter:
+        return self._register(Counter, name, help)
+
+    def gauge(self, name: str, help: str = '', func: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._register(Gauge, name, help, func)
+
+    def histogram(self, name: str, help: str = '', buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, buckets)
+
+    def snapshot(self) -> dict[str, float]:
+        return {name: value for metric in list(self._metrics.values()) for name, value in metric.samples()}
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            if metric.help:
+                lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(f'{name} {value}' for name, value in metric.samples())
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        if self._server is not None:
+            return self._server
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self) -> None:
+                if self.path.split('?')[0] != '/metrics':
+                    return self.send_error(404)
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name=f'{self.prefix}-metrics', daemon=True).start()
+        return self._server
+
+    def shutdown(self) -> None:
+        server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
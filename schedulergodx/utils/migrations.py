@@ -0,0 +1,109 @@
+from collections import namedtuple
+
+from sqlalchemy import DateTime, bindparam, inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from schedulergodx.utils.message import MessageConstructor
+
+Migration = namedtuple('Migration', 'version description upgrade')
+
+
+def _add_function_hash(connection: Connection) -> None:
+    connection.execute(text('ALTER TABLE task ADD COLUMN function_hash VARCHAR'))
+
+
+def _add_args_encoding(connection: Connection) -> None:
+    connection.execute(text('ALTER TABLE task ADD COLUMN args_encoding VARCHAR'))
+
+
+def _columns(connection: Connection, table: str) -> set[str]:
+    return {column['name'] for column in inspect(connection).get_columns(table)}
+
+
+def _native_time_to_start(connection: Connection, batch_size: int = 1000) -> None:
+    if 'time_to_start_native' not in _columns(connection, 'task'):
+        connection.execute(text('ALTER TABLE task ADD COLUMN time_to_start_native TIMESTAMP'))
+    update = (
+        text('UPDATE task SET time_to_start_native = :time_to_start WHERE id = :id')
+        .bindparams(bindparam('time_to_start', type_=DateTime()))
+    )
+    select = text(
+        'SELECT id, time_to_start FROM task WHERE id > :last AND time_to_start IS NOT NULL '
+        'AND time_to_start_native IS NULL ORDER BY id LIMIT :limit'
+        )
+    last = ''
+    while True:
+        rows = connection.execute(select, {'last': last, 'limit': batch_size}).fetchall()
+        if not rows:
+            break
+        batch = []
+        for id, blob in rows:
+            try:
+                batch.append({'id': id, 'time_to_start': MessageConstructor.deserialization(blob)})
+            except Exception:
+                continue
+        if batch:
+            connection.execute(update, batch)
+        connection.commit()
+        last = rows[-1].id
+    connection.execute(text('ALTER TABLE task DROP COLUMN time_to_start'))
+    connection.execute(text('ALTER TABLE task RENAME COLUMN time_to_start_native TO time_to_start'))
+    connection.execute(text('CREATE INDEX ix_task_status_time_to_start ON task (status, time_to_start)'))
+    connection.execute(text('CREATE INDEX ix_task_client ON task (client)'))
+
+
+def _add_task_lease(connection: Connection) -> None:
+    connection.execute(text('ALTER TABLE task ADD COLUMN lease_owner VARCHAR'))
+    connection.execute(text('ALTER TABLE task ADD COLUMN lease_expires TIMESTAMP'))
+    connection.execute(text('CREATE INDEX ix_task_status_lease_expires ON task (status, lease_expires)'))
+
+
+def _index_task_lease_owner(connection: Connection) -> None:
+    connection.execute(text('CREATE INDEX ix_task_lease_owner_status ON task (lease_owner, status)'))
+
+
+def _add_task_finished_at(connection: Connection) -> None:
+    connection.execute(text('ALTER TABLE task ADD COLUMN finished_at TIMESTAMP'))
+    connection.execute(text(
+        "UPDATE task SET finished_at = time_to_start "
+        "WHERE status IN ('COMPLETED', 'ERROR', 'CANCELLED', 'OVERDUE', 'ORPHAN')"
+        ))
+    connection.execute(text('CREATE INDEX ix_task_status_finished_at ON task (status, finished_at)'))
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, 'task.function_hash references the function table', _add_function_hash),
+    Migration(2, 'task.args_encoding tags how task_args and task_kwargs are stored', _add_args_encoding),
+    Migration(3, 'task.time_to_start is a native timestamp, indexes on (status, time_to_start) and client',
+              _native_time_to_start),
+    Migration(4, 'task.lease_owner and task.lease_expires record which service node runs a task', _add_task_lease),
+    Migration(5, 'waiting tasks are leased by the node that schedules them, index on (lease_owner, status)',
+              _index_task_lease_owner),
+    Migration(6, 'task.finished_at records when a task reached a final status, index on (status, finished_at)',
+              _add_task_finished_at),
+]
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def get_version(connection: Connection) -> int | None:
+    connection.execute(text('CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)'))
+    return connection.execute(text('SELECT MAX(version) FROM schema_version')).scalar()
+
+
+def migrate(engine: Engine, fresh: bool = False) -> int:
+    with engine.connect() as connection:
+        version = get_version(connection)
+        if version is None:
+            version = SCHEMA_VERSION if fresh else 0
+            connection.execute(text('INSERT INTO schema_version (version) VALUES (:version)'),
+                               {'version': version})
+        connection.commit()
+        for migration in MIGRATIONS:
+            if migration.version <= version:
+                continue
+            migration.upgrade(connection)
+            version = migration.version
+            connection.execute(text('UPDATE schema_version SET version = :version'),
+                               {'version': version})
+            connection.commit()
+    return version
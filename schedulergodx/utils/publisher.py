@@ -0,0 +1,145 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, wait
+from functools import partial
+from logging import Logger
+from typing import Mapping, Optional
+
+import pika
+from pika.spec import Basic
+
+from schedulergodx.utils.abstractions import AbstractionConnectClass
+from schedulergodx.utils.codec import JSON_CODEC, Codec
+from schedulergodx.utils.transport import Transport
+
+
+class PublishError(Exception):
+    pass
+
+
+class Publisher(AbstractionConnectClass):
+
+    def __init__(self, name: str, *, rmq_que: str, logger: Logger, rmq_connect: Transport,
+                 batch_size: int = 256) -> None:
+        super().__init__(name, rmq_que=rmq_que, logger=logger, rmq_connect=rmq_connect)
+        self.batch_size = batch_size
+        self._queue: deque = deque()
+        self._unconfirmed: dict[int, tuple[Future, Optional[str]]] = {}
+        self._delivery_tag = 0
+        self._declared: set[str] = set()
+        self._opening = False
+        self._scheduled = False
+        self._last: Future | None = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'<Publisher ({self.queue}, unconfirmed: {len(self._unconfirmed)})>'
+
+    def publish(self, data: Mapping, delivery_mode: int = 2, codec: Codec = JSON_CODEC,
+                routing_key: Optional[str] = None) -> Future:
+        future = Future()
+        properties = pika.BasicProperties(delivery_mode=delivery_mode, content_type=codec.content_type)
+        with self._lock:
+            self._queue.append((codec.encode(data), properties, future, data.get('id'), routing_key or self.queue))
+            self._last = future
+            scheduled, self._scheduled = self._scheduled, True
+        if not scheduled:
+            self.rmq_connect.call_soon(self._drain)
+        return future
+    
+    def flush(self, timeout: Optional[float] = None) -> None:
+        if self._last is not None:
+            wait([self._last], timeout)
+            
+    def close(self, timeout: Optional[float] = None) -> None:
+        self.flush(timeout)
+        self.rmq_connect.call_soon(self._close_channel)
+        
+    def _close_channel(self) -> None:
+        channel, self._channel = self._channel, None
+        if channel is not None and channel.is_open:
+            channel.close()
+
+    def _on_confirm(self, frame) -> None:
+        method = frame.method
+        if method.multiple:
+            tags = [tag for tag in self._unconfirmed if tag <= method.delivery_tag]
+        else:
+            tags = [method.delivery_tag] if method.delivery_tag in self._unconfirmed else []
+        for tag in tags:
+            future, message_id = self._unconfirmed.pop(tag)
+            if isinstance(method, Basic.Ack):
+                future.set_result(message_id)
+            else:
+                future.set_exception(PublishError(f'the broker rejected message ({message_id})'))
+                self._logging('error', f'message ({message_id}) was rejected by the broker')
+
+    def _drain(self) -> None:
+        channel = self._channel
+        if channel is None or not channel.is_open:
+            return self._open()
+        with self._lock:
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            self._scheduled = bool(self._queue)
+        if self._scheduled:
+            self.rmq_connect.call_soon(self._drain)
+        for index, (body, properties, future, message_id, routing_key) in enumerate(batch):
+            try:
+                if routing_key not in self._declared:
+                    channel.queue_declare(queue=routing_key, durable=True)
+                    self._declared.add(routing_key)
+                channel.basic_publish(exchange='', routing_key=routing_key, body=body, properties=properties)
+            except Exception as e:
+                self._logging('error', f'could not publish to queue "{self.queue}": {e}')
+                error = PublishError(f'could not publish message ({message_id}): {e}')
+                for _, _, future, _, _ in batch[index:]:
+                    future.set_exception(error)
+                return
+            self._delivery_tag += 1
+            self._unconfirmed[self._delivery_tag] = (future, message_id)
+            self._logging('debug', 'published message (%s) to queue "%s"', message_id, routing_key)
+            
+    def _open(self) -> None:
+        if self._opening:
+            return
+        self._opening = True
+        self.rmq_connect.open_channel(self.queue).add_done_callback(self._on_channel)
+        
+    def _on_channel(self, opened: Future) -> None:
+        try:
+            channel = opened.result()
+            channel.confirm_delivery(ack_nack_callback=self._on_confirm, 
+                                     callback=partial(self._on_confirm_selected, channel))
+        except Exception as e:
+            self._opening = False
+            self._logging('error', f'could not open a channel to queue "{self.queue}": {e}')
+            return self._fail_queued(PublishError(f'could not open a channel: {e}'))
+        channel.add_on_close_callback(self._on_channel_closed)
+        
+    def _on_confirm_selected(self, channel, frame) -> None:
+        self._opening = False
+        self._channel = channel
+        self._delivery_tag = 0
+        self._declared = {self.queue}
+        self._drain()
+        
+    def _on_channel_closed(self, channel, reason: Exception) -> None:
+        if channel is self._channel:
+            self._channel = None
+        self._opening = False
+        unconfirmed, self._unconfirmed = self._unconfirmed, {}
+        error = PublishError(f'the channel was closed before the broker confirmed the message: {reason}')
+        for future, _ in unconfirmed.values():
+            future.set_exception(error)
+        with self._lock:
+            self._scheduled = bool(self._queue)
+        if self._scheduled:
+            self._logging('error', f'the channel to queue "{self.queue}" was closed, reopening: {reason}')
+            self._open()
+
+    def _fail_queued(self, error: Exception) -> None:
+        with self._lock:
+            queued, self._queue = self._queue, deque()
+            self._scheduled = False
+        for _, _, future, _, _ in queued:
+            future.set_exception(error)
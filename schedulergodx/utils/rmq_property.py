@@ -1,8 +1,15 @@
+import threading
 from collections import namedtuple
-from typing import Any, Mapping, Sequence
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Callable, Mapping, Optional, Sequence
 
 import pika
-from pika.adapters.blocking_connection import BlockingChannel
+from pika.adapters.select_connection import IOLoop, SelectConnection
+from pika.channel import Channel
+from pika.exceptions import AMQPChannelError, AMQPConnectionError
+
+from schedulergodx.utils.transport import Transport
 
 RmqSettings = namedtuple('RmqSettings', 'parametrs credentials')
 rmq_default_settings = RmqSettings(
@@ -19,23 +26,143 @@ rmq_default_settings = RmqSettings(
     )
 )
 
-class RmqConnect:
+class RmqConnect(Transport):
     
     def __init__(self, rmq_parameters: Mapping[str, Any], 
-                  rmq_credentials: Sequence[str]) -> None:
+                  rmq_credentials: Sequence[str], max_retries: Optional[int] = 5,
+                  backoff: float = 0.5, max_backoff: float = 30) -> None:
         self.rmq_parameters = rmq_parameters
         self.rmq_credentials = rmq_credentials
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._ioloop: IOLoop | None = None
+        self._connection: SelectConnection | None = None
+        self._connecting = False
+        self._attempt = 0
+        self._requests: list[tuple[Future, str]] = []
+        self._queues: set[str] = set()
+        
+    def __repr__(self) -> str:
+        return f'<RmqConnect ({self.rmq_parameters.get("host")}:{self.rmq_parameters.get("port")})>'
         
-    def get_channel(self, queue: str) -> BlockingChannel:
-        connection = (
-            pika.BlockingConnection(
-                pika.ConnectionParameters(
-                    **self.rmq_parameters, credentials=pika.PlainCredentials(
-                        *self.rmq_credentials
-                        )
-                    )
+    def connection_parameters(self) -> pika.ConnectionParameters:
+        return pika.ConnectionParameters(
+            **self.rmq_parameters, credentials=pika.PlainCredentials(
+                *self.rmq_credentials
                 )
             )
-        channel = connection.channel()
-        channel.queue_declare(queue=queue, durable=True)         
-        return channel
\ No newline at end of file
+        
+    def _start(self) -> IOLoop:
+        with self._lock:
+            if self._thread is None:
+                self._ioloop = IOLoop()
+                self._thread = threading.Thread(target=self._run, args=(self._ioloop,), 
+                                                name=f'rmq-io-{self.rmq_parameters.get("host")}', daemon=True)
+                self._thread.start()
+            return self._ioloop
+        
+    @staticmethod
+    def _run(ioloop: IOLoop) -> None:
+        try:
+            ioloop.start()
+        finally:
+            ioloop.close()
+        
+    def in_io_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+        
+    def call_soon(self, callback: Callable[[], Any]) -> None:
+        self._start().add_callback_threadsafe(callback)
+        
+    def open_channel(self, queue: str) -> Future:
+        future = Future()
+        self.call_soon(partial(self._request, future, queue))
+        return future
+        
+    def _request(self, future: Future, queue: str) -> None:
+        if self._connection is not None and self._connection.is_open:
+            return self._open_channel(future, queue)
+        self._requests.append((future, queue))
+        if not self._connecting:
+            self._connect()
+            
+    def _connect(self) -> None:
+        if self._ioloop is None:
+            return
+        self._connecting = True
+        self._connection = SelectConnection(
+            self.connection_parameters(), on_open_callback=self._on_open,
+            on_open_error_callback=self._on_open_error, on_close_callback=self._on_close,
+            custom_ioloop=self._ioloop
+            )
+        
+    def _on_open(self, connection: SelectConnection) -> None:
+        self._connecting = False
+        self._attempt = 0
+        self._queues = set()
+        requests, self._requests = self._requests, []
+        for future, queue in requests:
+            self._open_channel(future, queue)
+            
+    def _on_open_error(self, connection: SelectConnection, error: Exception) -> None:
+        self._connection = None
+        self._attempt += 1
+        if self.max_retries is not None and self._attempt > self.max_retries:
+            self._connecting = False
+            self._attempt = 0
+            return self._fail_requests(AMQPConnectionError(f'could not connect to {self}: {error}'))
+        connection.ioloop.call_later(min(self.backoff * 2 ** (self._attempt - 1), self.max_backoff), self._connect)
+        
+    def _on_close(self, connection: SelectConnection, reason: Exception) -> None:
+        if connection is not self._connection:
+            return
+        self._connection = None
+        if self._requests:
+            self._connect()
+            
+    def _fail_requests(self, error: Exception) -> None:
+        requests, self._requests = self._requests, []
+        for future, _ in requests:
+            if not future.done():
+                future.set_exception(error)
+        
+    def _open_channel(self, future: Future, queue: str) -> None:
+        
+        def on_close(channel: Channel, reason: Exception) -> None:
+            if not future.done():
+                future.set_exception(AMQPChannelError(f'the channel was closed before it was ready: {reason}'))
+                
+        def on_declared(channel: Channel, frame) -> None:
+            self._queues.add(queue)
+            if not future.done():
+                future.set_result(channel)
+                
+        def on_open(channel: Channel) -> None:
+            if queue in self._queues:
+                return on_declared(channel, None)
+            channel.queue_declare(queue=queue, durable=True, callback=partial(on_declared, channel))
+        
+        channel = self._connection.channel(on_open_callback=on_open)
+        channel.add_on_close_callback(on_close)
+    
+    def close(self) -> None:
+        with self._lock:
+            thread, ioloop = self._thread, self._ioloop
+            self._thread = self._ioloop = None
+        if thread is None:
+            return
+        ioloop.add_callback_threadsafe(partial(self._shutdown, ioloop))
+        if thread is not threading.current_thread():
+            thread.join()
+            
+    def _shutdown(self, ioloop: IOLoop) -> None:
+        self._fail_requests(AMQPConnectionError(f'{self} was closed'))
+        connection, self._connection = self._connection, None
+        self._connecting = False
+        if connection is None or connection.is_closed or connection.is_closing:
+            return ioloop.stop()
+        connection.add_on_close_callback(lambda *args: ioloop.stop())
+        connection.close()
@@ -1,12 +1,33 @@
+import atexit
 import enum
-from typing import Any, List
+import threading
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from functools import partial
+from logging import Logger
+from typing import Any, Iterable, Iterator, List, Mapping, Optional
 
-from sqlalchemy import (Boolean, Column, Enum, Integer, String, create_engine,
-                        inspect, or_)
+from sqlalchemy import (Boolean, Column, DateTime, Enum, Index, Integer,
+                        LargeBinary, Select, String, create_engine, delete,
+                        event, insert, inspect, or_, select, text, tuple_,
+                        update)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, Row, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.orm.session import Session
 
+from schedulergodx.utils.logger import LoggerConstructor
+from schedulergodx.utils.migrations import migrate
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': -65536,
+    'busy_timeout': 5000,
+}
+
 
 class TaskStatus(enum.Enum):
     WAITING = 0
@@ -25,52 +46,344 @@ def servicemethod(method):
         return method(self, *args, **kwargs)
     return wrapper
 
+
+def _set_pragmas(pragmas: Mapping[str, Any], dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+    cursor.close()
+
+
 class DB:
     TaskBase = declarative_base()
     ClientBase = declarative_base()
+    FunctionBase = declarative_base()
+    ArchiveBase = declarative_base()
+    ResultBase = declarative_base()
         
     class Task(TaskBase):
         __tablename__ = 'task'
+        __table_args__ = (
+            Index('ix_task_status_time_to_start', 'status', 'time_to_start'),
+            Index('ix_task_client', 'client'),
+            Index('ix_task_status_lease_expires', 'status', 'lease_expires'),
+            Index('ix_task_lease_owner_status', 'lease_owner', 'status'),
+            Index('ix_task_status_finished_at', 'status', 'finished_at'),
+        )
         id = Column(String, primary_key=True)
         client = Column(String)
         status = Column(Enum(TaskStatus))
-        time_to_start = Column(String)
-        task = Column(String)
+        time_to_start = Column(DateTime)
+        task = Column(String, nullable=True)
+        function_hash = Column(String, nullable=True)
         task_args = Column(String, nullable=True)
         task_kwargs = Column(String, nullable=True)
+        args_encoding = Column(String, nullable=True)
         lifetime = Column(Integer)
         hard = Column(Boolean)
+        lease_owner = Column(String, nullable=True)
+        lease_expires = Column(DateTime, nullable=True)
+        finished_at = Column(DateTime, nullable=True)
         
     class Client(ClientBase):
         __tablename__ = 'client'
         name = Column(String, primary_key=True)
         enable_overdue = Column(Boolean)
         
-    def __init__(self, path: str = 'sqlite:///SchedulerGodX.db', 
-                 service_db: bool = False) -> None:
+    class Function(FunctionBase):
+        __tablename__ = 'function'
+        hash = Column(String, primary_key=True)
+        body = Column(String)
+        
+    class TaskArchive(ArchiveBase):
+        __tablename__ = 'task_archive'
+        id = Column(String, primary_key=True)
+        client = Column(String, index=True)
+        status = Column(Enum(TaskStatus))
+        time_to_start = Column(DateTime)
+        archived_at = Column(DateTime)
+        data = Column(LargeBinary)
+        
+    class TaskResult(ResultBase):
+        __tablename__ = 'task_result'
+        id = Column(String, primary_key=True)
+        client = Column(String)
+        encoding = Column(String)
+        size = Column(Integer)
+        data = Column(LargeBinary)
+        created_at = Column(DateTime, index=True)
+        
+    def __new__(cls, path: str = 'sqlite:///SchedulerGodX.db', *args, **kwargs) -> 'DB':
+        if cls is DB:
+            cls = STORAGE_BACKENDS.get(make_url(path).get_backend_name(), DB)
+        return super().__new__(cls)
+        
+    def __init__(self, path: str = 'sqlite:///SchedulerGodX.db', service_db: bool = False, 
+                 **engine_options: Any) -> None:
         self.service_db = service_db
-        self.engine = create_engine(path)
-        if not 'task' in inspect(self.engine).get_table_names():
+        self.engine = create_engine(path, **self._engine_options(engine_options))
+        self._on_engine(self.engine)
+        tables = inspect(self.engine).get_table_names()
+        if not 'task' in tables:
             self.TaskBase.metadata.create_all(self.engine)
-        if not 'client' in inspect(self.engine).get_table_names() and service_db:
+        if not 'client' in tables and service_db:
             self.ClientBase.metadata.create_all(self.engine)
+        if not 'function' in tables and service_db:
+            self.FunctionBase.metadata.create_all(self.engine)
+        if not 'task_archive' in tables and service_db:
+            self.ArchiveBase.metadata.create_all(self.engine)
+        if not 'task_result' in tables and service_db:
+            self.ResultBase.metadata.create_all(self.engine)
+        migrate(self.engine, fresh='task' not in tables)
         session_factory = sessionmaker(bind=self.engine)
         self._Session = scoped_session(session_factory)
+        
+    def __repr__(self) -> str:
+        return f'<{type(self).__name__} ({self.engine.url.render_as_string(hide_password=True)})>'
+    
+    def _engine_options(self, options: dict[str, Any]) -> dict[str, Any]:
+        return options
+    
+    def _on_engine(self, engine: Engine) -> None:
+        pass
+    
+    def _maintenance(self, *statements: str) -> None:
+        with self.engine.connect() as connection:
+            connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+            for statement in statements:
+                connection.execute(text(statement))
+                
+    @servicemethod
+    def compact(self) -> None:
+        pass
     
     def get_session(self) -> Session:
         return self._Session()
+    
+    def session(self) -> Session:
+        return self._Session.session_factory()
 
-    def get_unfulfilled_tasks(self, session: Session) -> List[Task]:
-        return (
+    def get_unfulfilled_tasks(self, session: Session, until: Optional[datetime] = None) -> List[Task]:
+        query = (
             session.query(DB.Task)
-            .filter(
-                or_(
-                    DB.Task.status == TaskStatus.WAITING,
-                    DB.Task.status == TaskStatus.WORK
-                    )
+            .filter(DB.Task.status.in_((TaskStatus.WAITING, TaskStatus.WORK)))
+        )
+        if until is not None:
+            query = query.filter(DB.Task.time_to_start < until)
+        return query.order_by(DB.Task.time_to_start).all()
+    
+    def get_tasks_due_within(self, session: Session, seconds: float) -> List[Task]:
+        return self.get_unfulfilled_tasks(session, until=datetime.now() + timedelta(seconds=seconds))
+    
+    @staticmethod
+    def _leasable(owner: Optional[str], now: datetime):
+        conditions = [DB.Task.lease_expires.is_(None), DB.Task.lease_expires < now]
+        if owner is not None:
+            conditions.append(DB.Task.lease_owner == owner)
+        return or_(*conditions)
+    
+    def iter_unfulfilled_tasks(self, session: Session, since: Optional[datetime] = None, 
+                               until: Optional[datetime] = None, batch_size: int = 1000,
+                               statuses: Iterable[TaskStatus] = (TaskStatus.WAITING, TaskStatus.WORK),
+                               leasable: bool = False, owner: Optional[str] = None) -> Iterator[Row]:
+        query = (
+            select(DB.Task.id, DB.Task.client, DB.Task.time_to_start, DB.Task.hard)
+            .where(DB.Task.status.in_(tuple(statuses)))
+            .order_by(DB.Task.time_to_start, DB.Task.id)
+            .limit(batch_size)
+        )
+        if since is not None:
+            query = query.where(DB.Task.time_to_start >= since)
+        if until is not None:
+            query = query.where(DB.Task.time_to_start < until)
+        if leasable:
+            query = query.where(self._leasable(owner, datetime.now()))
+        page = query
+        while True:
+            rows = session.execute(page).all()
+            yield from rows
+            if len(rows) < batch_size:
+                return
+            page = query.where(tuple_(DB.Task.time_to_start, DB.Task.id) > (rows[-1].time_to_start, rows[-1].id))
+    
+    @servicemethod
+    def mark_orphans(self, clients: Iterable[str], session: Session, owner: Optional[str] = None) -> int:
+        query = (
+            update(DB.Task)
+            .where(DB.Task.status == TaskStatus.WAITING)
+            .where(DB.Task.client.not_in(list(clients)))
+            .values(status=TaskStatus.ORPHAN, finished_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        if owner is not None:
+            query = query.where(self._leasable(owner, datetime.now()))
+        result = session.execute(query)
+        session.commit()
+        return result.rowcount
+    
+    @servicemethod
+    def mark_overdue(self, clients: Iterable[str], before: datetime, session: Session, 
+                     owner: Optional[str] = None) -> int:
+        query = (
+            update(DB.Task)
+            .where(DB.Task.status == TaskStatus.WAITING)
+            .where(DB.Task.client.in_(list(clients)))
+            .where(DB.Task.time_to_start <= before)
+            .values(status=TaskStatus.OVERDUE, finished_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        if owner is not None:
+            query = query.where(self._leasable(owner, datetime.now()))
+        result = session.execute(query)
+        session.commit()
+        return result.rowcount
+    
+    def insert_tasks(self, tasks: list[dict[str, Any]], session: Session) -> None:
+        session.execute(insert(DB.Task), tasks)
+    
+    def _claimable(self, until: Optional[datetime], limit: int, ids: Optional[Iterable[str]], 
+                   owner: Optional[str] = None) -> Select:
+        query = (
+            select(DB.Task.id)
+            .where(DB.Task.status == TaskStatus.WAITING)
+            .order_by(DB.Task.time_to_start)
+            .limit(limit)
+        )
+        if until is not None:
+            query = query.where(DB.Task.time_to_start <= until)
+        if ids is not None:
+            query = query.where(DB.Task.id.in_(list(ids)))
+        if owner is not None:
+            query = query.where(self._leasable(owner, datetime.now()))
+        return query
+    
+    @servicemethod
+    def claim_tasks(self, session: Session, owner: Optional[str] = None, lease: Optional[timedelta] = None, 
+                    until: Optional[datetime] = None, limit: int = 100, 
+                    ids: Optional[Iterable[str]] = None) -> list[Task]:
+        result = session.execute(
+            update(DB.Task)
+            .where(DB.Task.id.in_(self._claimable(until, limit, ids, owner).scalar_subquery()))
+            .where(DB.Task.status == TaskStatus.WAITING)
+            .values(status=TaskStatus.WORK, lease_owner=owner, 
+                    lease_expires=datetime.now() + lease if lease is not None else None)
+            .returning(DB.Task)
+            .execution_options(synchronize_session=False)
+        )
+        tasks = list(result.scalars())
+        for task in tasks:
+            session.expunge(task)
+        session.commit()
+        return tasks
+    
+    @servicemethod
+    def adopt_tasks(self, ids: Iterable[str], owner: str, expires: datetime, session: Session) -> list[Row]:
+        ids = list(ids)
+        if not ids:
+            return []
+        result = session.execute(
+            update(DB.Task)
+            .where(DB.Task.id.in_(self._claimable(None, len(ids), ids, owner).scalar_subquery()))
+            .where(DB.Task.status == TaskStatus.WAITING)
+            .values(lease_owner=owner, lease_expires=expires)
+            .returning(DB.Task.id, DB.Task.time_to_start, DB.Task.hard)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        session.commit()
+        return rows
+    
+    @servicemethod
+    def renew_leases(self, owner: str, expires: datetime, session: Session, 
+                     until: Optional[datetime] = None) -> int:
+        renewed = 0
+        for status in (TaskStatus.WORK, TaskStatus.WAITING):
+            query = (
+                update(DB.Task)
+                .where(DB.Task.lease_owner == owner)
+                .where(DB.Task.status == status)
+                .values(lease_expires=expires)
+                .execution_options(synchronize_session=False)
             )
-            .all()
+            if status is TaskStatus.WAITING and until is not None:
+                query = query.where(DB.Task.time_to_start < until)
+            renewed += session.execute(query).rowcount
+        session.commit()
+        return renewed
+    
+    @servicemethod
+    def reclaim_expired(self, now: datetime, session: Session) -> int:
+        result = session.execute(
+            update(DB.Task)
+            .where(DB.Task.status == TaskStatus.WORK)
+            .where(or_(DB.Task.lease_expires.is_(None), DB.Task.lease_expires < now))
+            .values(status=TaskStatus.WAITING, lease_owner=None, lease_expires=None)
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        return result.rowcount
+    
+    @servicemethod
+    def get_finished_tasks(self, before: datetime, statuses: Iterable[TaskStatus], session: Session, 
+                           limit: int = 500) -> list[Task]:
+        return list(session.scalars(self._finished(select(DB.Task), before, statuses, limit)))
+    
+    @servicemethod
+    def get_finished_task_ids(self, before: datetime, statuses: Iterable[TaskStatus], session: Session, 
+                              limit: int = 500) -> list[str]:
+        return list(session.scalars(self._finished(select(DB.Task.id), before, statuses, limit)))
+    
+    @staticmethod
+    def _finished(query: Select, before: datetime, statuses: Iterable[TaskStatus], limit: int) -> Select:
+        return (
+            query
+            .where(DB.Task.status.in_(tuple(statuses)))
+            .where(DB.Task.finished_at < before)
+            .limit(limit)
+        )
+    
+    @servicemethod
+    def delete_tasks(self, ids: Iterable[str], session: Session, 
+                     archive: Optional[list[dict[str, Any]]] = None) -> int:
+        if archive:
+            session.execute(insert(DB.TaskArchive), archive)
+        ids = list(ids)
+        session.execute(
+            delete(DB.TaskResult)
+            .where(DB.TaskResult.id.in_(ids))
+            .execution_options(synchronize_session=False)
         )
+        result = session.execute(
+            delete(DB.Task)
+            .where(DB.Task.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        return result.rowcount
+    
+    def insert_results(self, results: list[dict[str, Any]], session: Session) -> None:
+        session.execute(insert(DB.TaskResult), results)
+    
+    @servicemethod
+    def get_result(self, id: str, session: Session) -> TaskResult | None:
+        return session.get(DB.TaskResult, id)
+    
+    @servicemethod
+    def add_function(self, hash: str, body: str, session: Session) -> None:
+        session.merge(DB.Function(hash=hash, body=body))
+        session.commit()
+        
+    @servicemethod
+    def get_function_body(self, hash: str, session: Session) -> str | None:
+        return session.query(DB.Function.body).filter(DB.Function.hash == hash).scalar()
+    
+    @servicemethod
+    def has_function(self, hash: str, session: Session) -> bool:
+        return session.query(DB.Function.hash).filter(DB.Function.hash == hash).first() is not None
+    
+    @servicemethod
+    def get_function_hashes(self, session: Session) -> list[str]:
+        return list(session.scalars(select(DB.Function.hash)))
     
     @servicemethod
     def add_client(self, client: dict, session: Session) -> None:
@@ -78,6 +391,13 @@ class DB:
         session.merge(client)
         session.commit()
         
+    @servicemethod
+    def get_client_dict(self, name: str, session: Session) -> dict[str, Any] | None:
+        client = session.get(DB.Client, name)
+        if client is None:
+            return None
+        return {c.key: getattr(client, c.key) for c in inspect(client).mapper.column_attrs}
+        
     @servicemethod
     def get_clients(self, session: Session) -> list[Client]:
         return session.query(DB.Client).all()
@@ -90,4 +410,208 @@ class DB:
                 {c.key: getattr(client, c.key) for c 
                  in inspect(client).mapper.column_attrs}
                 )
-        return clients
\ No newline at end of file
+        return clients
+    
+    
+class SqliteDB(DB):
+    
+    def __init__(self, path: str = 'sqlite:///SchedulerGodX.db', service_db: bool = False, 
+                 pragmas: Optional[Mapping[str, Any]] = None, **engine_options: Any) -> None:
+        self.pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+        super().__init__(path, service_db=service_db, **engine_options)
+        
+    def _engine_options(self, options: dict[str, Any]) -> dict[str, Any]:
+        options.setdefault('connect_args', {}).setdefault('check_same_thread', False)
+        return options
+        
+    def _on_engine(self, engine: Engine) -> None:
+        event.listen(engine, 'connect', partial(_set_pragmas, self.pragmas))
+        
+    def insert_tasks(self, tasks: list[dict[str, Any]], session: Session) -> None:
+        session.execute(sqlite.insert(DB.Task).on_conflict_do_nothing(index_elements=['id']), tasks)
+        
+    def insert_results(self, results: list[dict[str, Any]], session: Session) -> None:
+        session.execute(sqlite.insert(DB.TaskResult).on_conflict_do_nothing(index_elements=['id']), results)
+        
+    @servicemethod
+    def compact(self) -> None:
+        self._maintenance('PRAGMA wal_checkpoint(TRUNCATE)', 'VACUUM', 'PRAGMA optimize')
+        
+        
+class PostgresDB(DB):
+    
+    def __init__(self, path: str = 'postgresql+psycopg2://localhost/schedulergodx', service_db: bool = False, 
+                 pool_size: int = 10, max_overflow: int = 20, pool_timeout: float = 30, 
+                 pool_recycle: int = 1800, **engine_options: Any) -> None:
+        engine_options.setdefault('pool_size', pool_size)
+        engine_options.setdefault('max_overflow', max_overflow)
+        engine_options.setdefault('pool_timeout', pool_timeout)
+        engine_options.setdefault('pool_recycle', pool_recycle)
+        engine_options.setdefault('pool_pre_ping', True)
+        engine_options.setdefault('insertmanyvalues_page_size', 1000)
+        super().__init__(path, service_db=service_db, **engine_options)
+        
+    def insert_tasks(self, tasks: list[dict[str, Any]], session: Session) -> None:
+        session.execute(postgresql.insert(DB.Task).on_conflict_do_nothing(index_elements=['id']), tasks)
+        
+    def insert_results(self, results: list[dict[str, Any]], session: Session) -> None:
+        session.execute(postgresql.insert(DB.TaskResult).on_conflict_do_nothing(index_elements=['id']), results)
+        
+    def _claimable(self, until: Optional[datetime], limit: int, ids: Optional[Iterable[str]], 
+                   owner: Optional[str] = None) -> Select:
+        return super()._claimable(until, limit, ids, owner).with_for_update(skip_locked=True)
+    
+    @servicemethod
+    def compact(self) -> None:
+        self._maintenance('VACUUM ANALYZE task', 'VACUUM ANALYZE task_archive')
+    
+    
+STORAGE_BACKENDS: dict[str, type[DB]] = {'sqlite': SqliteDB, 'postgresql': PostgresDB}
+
+
+class Durability(enum.Enum):
+    SYNC = 0
+    GROUP = 1
+    ASYNC = 2
+
+
+def _by_keys(rows: Iterable[dict]) -> list[list[dict]]:
+    groups: dict[tuple, list[dict]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return list(groups.values())
+
+
+class WriteBuffer:
+
+    def __init__(self, db: DB, durability: Durability = Durability.GROUP, interval: float = 0.005, 
+                 max_rows: int = 500, logger: Optional[Logger] = None) -> None:
+        self.db = db
+        self.durability = durability
+        self.interval = interval
+        self.max_rows = max_rows
+        self.logger = logger
+        self._inserts: dict[str, dict] = {}
+        self._updates: dict[str, dict] = {}
+        self._results: dict[str, dict] = {}
+        self._writes: list[tuple[Future, list[dict], list[dict], list[dict]]] = []
+        self._waiting = 0
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._running = False
+        
+    def __repr__(self) -> str:
+        return f'<WriteBuffer ({self.durability.name}, pending: {self._pending()})>'
+    
+    def _logging(self, level: str, message: str, *args) -> None:
+        if self.logger is not None:
+            LoggerConstructor.log(self.logger, level, f'write-buffer - {message}', *args)
+    
+    def start(self) -> None:
+        if self.durability is Durability.SYNC or self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='write-buffer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        
+    def close(self) -> None:
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            atexit.unregister(self.close)
+        self.flush()
+        
+    def insert(self, rows: Iterable[Mapping[str, Any]], wait: bool = True) -> Future:
+        return self._write([dict(row) for row in rows], [], wait)
+    
+    def set_status(self, id: str, status: TaskStatus, wait: bool = True, **values) -> Future:
+        return self._write([], [{'id': id, 'status': status, **values}], wait)
+    
+    def add_result(self, row: Mapping[str, Any], wait: bool = False) -> Future:
+        return self._write([], [], wait, results=[dict(row)])
+    
+    def _pending(self) -> int:
+        return len(self._inserts) + len(self._updates) + len(self._results)
+        
+    def _write(self, inserts: list[dict], updates: list[dict], wait: bool, 
+               results: Iterable[dict] = ()) -> Future:
+        future = Future()
+        with self._condition:
+            for row in inserts:
+                self._inserts[row['id']] = dict(row)
+            for row in updates:
+                if row['id'] in self._inserts:
+                    self._inserts[row['id']].update(row)
+                else:
+                    self._updates.setdefault(row['id'], {}).update(row)
+            for row in results:
+                self._results[row['id']] = row
+            self._writes.append((future, inserts, updates, results))
+            blocking = wait and self._thread is not None and self.durability is not Durability.ASYNC
+            if blocking:
+                self._waiting += 1
+            if blocking or len(self._writes) == 1 or self._pending() >= self.max_rows:
+                self._condition.notify()
+        if self._thread is None:
+            self.flush()
+            future.result()
+            return future
+        if not blocking:
+            return future
+        try:
+            future.result()
+        finally:
+            with self._condition:
+                self._waiting -= 1
+        return future
+    
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._running and not self._writes:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                self._condition.wait_for(
+                    lambda: not self._running or self._waiting or self._pending() >= self.max_rows, self.interval
+                    )
+            self.flush()
+    
+    def _commit(self, inserts: list[dict], updates: list[dict], results: list[dict]) -> None:
+        with self.db.session() as session:
+            for rows in _by_keys(inserts):
+                self.db.insert_tasks(rows, session)
+            for rows in _by_keys(updates):
+                session.execute(update(DB.Task), rows)
+            if results:
+                self.db.insert_results(results, session)
+            session.commit()
+            
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._condition:
+                inserts, self._inserts = self._inserts, {}
+                updates, self._updates = self._updates, {}
+                results, self._results = self._results, {}
+                writes, self._writes = self._writes, []
+            if not writes:
+                return
+            try:
+                self._commit(list(inserts.values()), list(updates.values()), list(results.values()))
+            except Exception:
+                for future, write_inserts, write_updates, write_results in writes:
+                    try:
+                        self._commit(write_inserts, write_updates, write_results)
+                    except Exception as e:
+                        self._logging('error', f'the write was discarded: {e}')
+                        future.set_exception(e)
+                    else:
+                        future.set_result(None)
+                return
+            for future, *_ in writes:
+                future.set_result(None)
@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+
+class Transport(ABC):
+
+    @abstractmethod
+    def call_soon(self, callback: Callable[[], Any]) -> None:
+        ''' '''
+
+    @abstractmethod
+    def open_channel(self, queue: str) -> Future:
+        ''' '''
+
+    @abstractmethod
+    def in_io_thread(self) -> bool:
+        ''' '''
+
+    def get_channel(self, queue: str, timeout: Optional[float] = None) -> Any:
+        if self.in_io_thread():
+            raise RuntimeError('get_channel() would block the I/O thread, use open_channel()')
+        return self.open_channel(queue).result(timeout)
+
+    @abstractmethod
+    def close(self) -> None:
+        ''' '''
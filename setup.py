@@ -20,6 +20,9 @@ setup(
         'SQLAlchemy==2.0.31',
         'ulid==1.1'
     ],
+    extras_require={
+        'postgres': ['psycopg2-binary>=2.9'],
+    },
     author='EliseyGodX',
     description='A simple task manager to run functions',
     long_description=open('README.md').read(),
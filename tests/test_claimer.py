@@ -0,0 +1,42 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+
+import schedulergodx.utils as utils
+from schedulergodx.service.claimer import Claimer
+from schedulergodx.utils import Durability, TaskStatus, WriteBuffer
+
+
+def _row(id: str, **values) -> dict:
+    return {'id': id, 'client': 'client', 'status': TaskStatus.WAITING, 'time_to_start': datetime.now(),
+            'task_args': '[]', 'task_kwargs': '{}', 'lifetime': 3, 'hard': False, **values}
+
+
+def test_due_tasks_are_claimed_in_one_batch(tmp_path):
+    db = utils.DB(f'sqlite:///{tmp_path / "claimer.db"}', service_db=True)
+    writer = WriteBuffer(db, durability=Durability.GROUP, interval=60)
+    writer.start()
+    writer.insert([_row('committed'), _row('taken', lease_owner='other',
+                                          lease_expires=datetime.now() + timedelta(minutes=1))])
+    writer.insert([_row('buffered')], wait=False)
+    claimed, missed, done = [], [], threading.Event()
+
+    def settle(target, value):
+        target.append(value)
+        if len(claimed) + len(missed) == 3:
+            done.set()
+
+    claimer = Claimer(db, writer, owner='node', lease=timedelta(minutes=1), logger=logging.getLogger('test'),
+                      on_claimed=lambda task: settle(claimed, task), on_missed=lambda id: settle(missed, id))
+    for id in ('committed', 'buffered', 'taken'):
+        claimer.add(id)
+    claimer.start()
+    try:
+        assert done.wait(10)
+    finally:
+        claimer.stop()
+        writer.close()
+    assert sorted(task.id for task in claimed) == ['buffered', 'committed']
+    assert {task.status for task in claimed} == {TaskStatus.WORK}
+    assert {task.lease_owner for task in claimed} == {'node'}
+    assert missed == ['taken']
@@ -0,0 +1,47 @@
+import pytest
+
+from schedulergodx.utils import (BINARY_CODEC, JSON_CODEC, CodecError,
+                                 Message, MessageConstructor)
+
+
+def add(a, b, c=0):
+    return a + b + c
+
+
+def _round_trip(codec, func_args, func_kwargs) -> tuple:
+    data = MessageConstructor.task(id='id', client='client', lifetime=3, func=add,
+                                   func_args=func_args, func_kwargs=func_kwargs)
+    message = MessageConstructor.disassemble(codec.encode(data), codec.content_type)
+    encoding = message.arguments.get('encoding')
+    func = MessageConstructor.deserialization(MessageConstructor.as_text(message.arguments['function']))
+    args, kwargs = MessageConstructor.decode_arguments(
+        encoding,
+        MessageConstructor.store_arguments(encoding, message.arguments['args']),
+        MessageConstructor.store_arguments(encoding, message.arguments['kwargs'])
+        )
+    return message, func(*args, **kwargs)
+
+
+@pytest.mark.parametrize('codec', [JSON_CODEC, BINARY_CODEC])
+def test_task_round_trip(codec):
+    message, result = _round_trip(codec, (1, 2), {'c': 3})
+    assert message.metadata == {'id': 'id', 'client': 'client', 'type': Message.TASK}
+    assert result == 6
+
+
+@pytest.mark.parametrize('codec', [JSON_CODEC, BINARY_CODEC])
+def test_binary_arguments_round_trip(codec):
+    _, result = _round_trip(codec, (b'\x00', b'\xff'), {'c': b'!'})
+    assert result == b'\x00\xff!'
+
+
+def test_binary_codec_carries_bytes_without_base64():
+    body = BINARY_CODEC.encode({'payload': b'\x00' * 1024})
+    assert len(body) < 1100
+    assert BINARY_CODEC.decode(body) == {'payload': b'\x00' * 1024}
+
+
+@pytest.mark.parametrize('body', [b'{}', b'SGDX\x09\x00\x00\x00\x02{}', BINARY_CODEC.encode({'a': b'xy'})[:-1]])
+def test_binary_codec_rejects_foreign_or_truncated_bodies(body):
+    with pytest.raises(CodecError):
+        BINARY_CODEC.decode(body)
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+
+import pytest
+
+from schedulergodx.client import AsyncClient, Client, TaskFailedError
+from schedulergodx.service import Service
+from schedulergodx.service.core import Task
+from schedulergodx.utils import DB, MemoryConnect
+
+
+def add(a, b):
+    return a + b
+
+
+def total(values):
+    return sum(values)
+
+
+def sleep(seconds):
+    time.sleep(seconds)
+
+
+def nothing():
+    return None
+
+
+def fail():
+    raise ValueError('failed on purpose')
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = Service(rmq_connect=MemoryConnect(), db=DB(f'sqlite:///{tmp_path / "service.db"}', service_db=True),
+                      max_workers=2, max_processes=1, heartbeat_interval=1)
+    thread = threading.Thread(target=service.start, daemon=True)
+    thread.start()
+    yield service
+    service.stop()
+    thread.join(30)
+    assert not thread.is_alive()
+
+
+@pytest.fixture
+def client(service):
+    return Client(name='client', rmq_connect=service.rmq_connect, init_timeout=10)
+
+
+def test_soft_task(client):
+    task = client.task(add)
+    ids = [task.launch(i, 1) for i in range(20)]
+    assert [client.get_result(id, 10) for id in ids] == [i + 1 for i in range(20)]
+
+
+def test_launch_many_passes_lists_as_one_argument(client):
+    batch = client.task(total).launch_many([[1, 2], [3, 4, 5], ([6],)])
+    assert [client.get_result(id, 10) for id in batch.ids] == [3, 12, 6]
+
+
+def test_hard_task(client):
+    task = client.task(add)
+    task.set_parameters(hard=True)
+    assert client.get_result(task.launch(2, 3), 30) == 5
+
+
+def test_delayed_task(client):
+    task = client.task(add)
+    task.set_parameters(delay=1)
+    started = time.monotonic()
+    assert client.get_result(task.launch(1, 1), 10) == 2
+    assert time.monotonic() - started >= 1
+
+
+def test_failure_is_raised_again(client):
+    id = client.task(fail).launch()
+    for _ in range(2):
+        with pytest.raises(TaskFailedError, match='failed on purpose'):
+            client.get_result(id, 10)
+
+
+def test_stop_settles_every_committed_message(service, client):
+    task = client.task(add)
+    task.set_parameters(delay=3600)
+    ids = [task.launch(i, 1) for i in range(200)]
+    client.flush(10)
+    while service.metrics.messages.value < len(ids) + 2:
+        time.sleep(0.01)
+    service.stop()
+    assert service.rmq_connect.broker.depth(service.rmq_consumer_que) == 0
+    with service.db.session() as session:
+        assert session.query(service.db.Task).count() == len(ids)
+
+
+def test_task_beyond_the_window_is_kept_if_the_window_moved_before_its_commit(service):
+    now = time.time()
+    service._horizon = now + 60
+    task = Task(id='late', time_to_start=now + 120, db=service.db)
+    write = Future()
+    service._add_tasks([task], write)
+    assert 'late' not in service.scheduler
+    service._horizon = now + 180
+    write.set_result(None)
+    assert 'late' in service.scheduler
+
+
+def test_heartbeat_runs_off_the_dispatcher(service, monkeypatch):
+    threads, renew_leases = [], service.db.renew_leases
+
+    def record(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return renew_leases(*args, **kwargs)
+
+    monkeypatch.setattr(service.db, 'renew_leases', record)
+    deadline = time.monotonic() + 10
+    while not threads and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert threads and threads[0].startswith('recovery')
+
+
+def test_get_result_looks_up_a_missed_response(service):
+    client = Client(name='forgetful', rmq_connect=service.rmq_connect, init_timeout=10, result_poll_interval=1)
+    ids = [client.task(add).launch(2, 3), client.task(fail).launch(), client.task(nothing).launch()]
+    deadline = time.monotonic() + 10
+    while len(client.consumer.router._unclaimed) < len(ids) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    client.consumer.router._unclaimed.clear()
+    assert client.get_result(ids[0], 10) == 5
+    with pytest.raises(TaskFailedError, match='ERROR'):
+        client.get_result(ids[1], 10)
+    assert client.get_result(ids[2], 10) is None
+
+
+def test_recovery_pauses_while_the_worker_pool_holds_tasks(service, client, monkeypatch):
+    monkeypatch.setattr(service.worker_pool, 'holding', lambda: True)
+    horizon = service._horizon
+    since = service._horizon_datetime()
+    service._page_in(since, since + timedelta(seconds=service.recovery_horizon))
+    assert service._horizon == horizon
+    assert ('recovery', since, since + timedelta(seconds=service.recovery_horizon)) in service.scheduler
+
+
+def test_timed_out_soft_task_is_counted_as_hung(service, client):
+    task = client.task(sleep)
+    task.set_parameters(task_lifetime=1)
+    with pytest.raises(TaskFailedError):
+        client.get_result(task.launch(3), 10)
+    assert service.worker_pool.stats().hung == 1
+    deadline = time.monotonic() + 10
+    while service.worker_pool.hung() and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert service.worker_pool.stats().hung == 0
+
+
+def test_async_client_over_memory_connect(service):
+
+    async def run() -> list:
+        async with AsyncClient(name='async-client', rmq_connect=service.rmq_connect, init_timeout=10,
+                               result_poll_interval=1) as client:
+            task = client.task(add)
+            results = [await task.launch(i, 1) for i in range(5)] + await task.launch_many([(7, 8)])
+            values = [await result.value(10) for result in results]
+            lost = await task.launch(2, 2)
+            await lost.wait(10)
+            client.router._unclaimed.clear()
+            values.append(await client.get_result(lost.id, 10))
+            return values
+
+    assert asyncio.run(run()) == [1, 2, 3, 4, 5, 15, 4]
+
+
+def test_async_client_rejects_an_unsupported_transport():
+    with pytest.raises(TypeError, match='utils.Transport'):
+        AsyncClient(name='async-client', rmq_connect=object())
@@ -0,0 +1,25 @@
+import logging
+import threading
+
+from schedulergodx.utils.logger import LoggerConstructor, _stop_listeners
+
+
+class _Argument:
+
+    def __init__(self) -> None:
+        self.threads: list[str] = []
+
+    def __str__(self) -> str:
+        self.threads.append(threading.current_thread().name)
+        return 'argument'
+
+
+def test_records_are_formatted_by_the_listener(tmp_path):
+    path = tmp_path / 'test.log'
+    logger = LoggerConstructor('test-logger', log_file=str(path), log_level=logging.DEBUG).getLogger()
+    logger.propagate = False
+    argument = _Argument()
+    logger.info('message with %s', argument)
+    _stop_listeners()
+    assert argument.threads and threading.current_thread().name not in argument.threads
+    assert 'message with argument' in path.read_text()
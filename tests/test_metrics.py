@@ -0,0 +1,28 @@
+from schedulergodx.utils.metrics import MetricsRegistry
+
+
+def test_counter_metadata_names_its_sample():
+    registry = MetricsRegistry('test')
+    registry.counter('tasks_completed', 'tasks completed successfully').inc(2)
+    registry.gauge('active_workers', 'busy workers', lambda: 3)
+    lines = registry.render().splitlines()
+    assert lines[:3] == ['# HELP test_tasks_completed_total tasks completed successfully',
+                         '# TYPE test_tasks_completed_total counter',
+                         'test_tasks_completed_total 2.0']
+    assert lines[3:] == ['# HELP test_active_workers busy workers',
+                         '# TYPE test_active_workers gauge',
+                         'test_active_workers 3']
+    assert registry['tasks_completed'].value == 2
+    assert registry.snapshot() == {'test_tasks_completed_total': 2.0, 'test_active_workers': 3}
+
+
+def test_histogram_samples_share_the_family_name():
+    registry = MetricsRegistry('test')
+    histogram = registry.histogram('run_seconds', buckets=(1, 2))
+    histogram.observe(1.5)
+    assert registry.render().splitlines() == ['# TYPE test_run_seconds histogram',
+                                              'test_run_seconds_bucket{le="1"} 0',
+                                              'test_run_seconds_bucket{le="2"} 1',
+                                              'test_run_seconds_bucket{le="+Inf"} 1',
+                                              'test_run_seconds_sum 1.5',
+                                              'test_run_seconds_count 1']
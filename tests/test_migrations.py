@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+from schedulergodx.utils.message import MessageConstructor
+from schedulergodx.utils.storage import DB
+from schedulergodx.utils.migrations import SCHEMA_VERSION, migrate
+
+
+def test_time_to_start_is_backfilled_in_batches(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "old.db"}')
+    start = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(text('CREATE TABLE task (id VARCHAR PRIMARY KEY, client VARCHAR, '
+                                'status VARCHAR, time_to_start BLOB)'))
+        connection.execute(
+            text('INSERT INTO task (id, client, status, time_to_start) VALUES (:id, :client, :status, :time)'),
+            [{'id': f'{i:05}', 'client': 'client', 'status': 'WAITING',
+              'time': MessageConstructor.serialization(start + timedelta(seconds=i))} for i in range(2500)]
+            + [{'id': 'broken', 'client': 'client', 'status': 'WAITING', 'time': b'not dill'}]
+            )
+    assert migrate(engine) == SCHEMA_VERSION
+    with engine.connect() as connection:
+        rows = dict(connection.execute(text('SELECT id, time_to_start FROM task')).fetchall())
+    assert len(rows) == 2501
+    assert rows['broken'] is None
+    assert rows['02499'].startswith(str(start + timedelta(seconds=2499)))
+
+
+def test_finished_at_is_backfilled_from_time_to_start(tmp_path):
+    path = f'sqlite:///{tmp_path / "v5.db"}'
+    DB(path, service_db=True)
+    engine = create_engine(path)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(text('DROP INDEX ix_task_status_finished_at'))
+        connection.execute(text('ALTER TABLE task DROP COLUMN finished_at'))
+        connection.execute(text('UPDATE schema_version SET version = 5'))
+        connection.execute(
+            text('INSERT INTO task (id, client, status, time_to_start) VALUES (:id, :client, :status, :time)'),
+            [{'id': 'done', 'client': 'client', 'status': 'COMPLETED', 'time': start},
+             {'id': 'waiting', 'client': 'client', 'status': 'WAITING', 'time': start}]
+            )
+    assert migrate(engine) == SCHEMA_VERSION
+    with engine.connect() as connection:
+        rows = dict(connection.execute(text('SELECT id, finished_at FROM task')).fetchall())
+    assert rows['done'].startswith(str(start))
+    assert rows['waiting'] is None
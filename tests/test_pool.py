@@ -0,0 +1,74 @@
+import logging
+import threading
+
+import pytest
+
+from schedulergodx.service.pool import (BackpressurePolicy, PoolSaturated,
+                                        WorkerPool)
+
+
+def _pool(policy: BackpressurePolicy) -> WorkerPool:
+    pool = WorkerPool(1, 1, logger=logging.getLogger('test-pool'), policy=policy)
+    pool.start()
+    return pool
+
+
+def _saturate(pool: WorkerPool) -> threading.Event:
+    release, started = threading.Event(), threading.Event()
+    pool.submit(lambda: (started.set(), release.wait(10)))
+    assert started.wait(5)
+    pool.submit(lambda: None)
+    return release
+
+
+@pytest.mark.parametrize('policy', [BackpressurePolicy.REJECT, BackpressurePolicy.SPILL])
+def test_saturated_pool_refuses_tasks(policy):
+    pool = _pool(policy)
+    release = _saturate(pool)
+    try:
+        with pytest.raises(PoolSaturated):
+            pool.submit(lambda: None)
+        stats = pool.stats()
+        assert (stats.busy, stats.queue_depth, stats.rejected) == (1, 1, 1)
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_block_holds_tasks_and_releases_waiters_when_drained():
+    pool = _pool(BackpressurePolicy.BLOCK)
+    release = _saturate(pool)
+    ran, ready = threading.Event(), threading.Event()
+    try:
+        pool.submit(ran.set)
+        assert pool.holding()
+        pool.when_ready(ready.set)
+        assert not ready.is_set()
+        release.set()
+        assert ran.wait(5) and ready.wait(5)
+        assert not pool.holding()
+    finally:
+        release.set()
+        pool.shutdown()
+    assert pool.stats().completed == 3
+
+
+def test_when_ready_runs_at_once_without_held_tasks():
+    pool = _pool(BackpressurePolicy.BLOCK)
+    ready = threading.Event()
+    try:
+        pool.when_ready(ready.set)
+        assert ready.is_set()
+    finally:
+        pool.shutdown()
+
+
+def test_hung_workers_are_counted():
+    pool = _pool(BackpressurePolicy.BLOCK)
+    try:
+        pool.mark_hung()
+        assert pool.stats().hung == 1
+        pool.mark_hung(False)
+        assert pool.stats().hung == 0
+    finally:
+        pool.shutdown()
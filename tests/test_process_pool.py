@@ -0,0 +1,55 @@
+import logging
+import os
+
+import pytest
+
+from schedulergodx.service.process_pool import ProcessPool, ProcessTaskError
+from schedulergodx.utils import ArgumentsEncoding, MessageConstructor
+
+
+def _cannot_load():
+    raise RuntimeError('cannot be loaded in the service')
+
+
+class _Unloadable:
+
+    def __reduce__(self):
+        return (_cannot_load, ())
+
+
+def unloadable():
+    return _Unloadable()
+
+
+def crash():
+    os._exit(3)
+
+
+def answer():
+    return 42
+
+
+@pytest.fixture
+def pool():
+    pool = ProcessPool(1, logger=logging.getLogger('test-process-pool'))
+    pool.start()
+    yield pool
+    pool.shutdown()
+
+
+def _run(pool: ProcessPool, func) -> object:
+    return pool.run(MessageConstructor.serialization(func), '[]', '{}', timeout=30,
+                    args_encoding=ArgumentsEncoding.JSON.value)
+
+
+def test_unloadable_result_keeps_the_worker(pool):
+    with pytest.raises(ProcessTaskError, match='cannot be deserialized'):
+        _run(pool, unloadable)
+    assert pool._idle.qsize() == 1
+    assert _run(pool, answer) == 42
+
+
+def test_crashed_worker_reports_its_exit_code_and_is_replaced(pool):
+    with pytest.raises(ProcessTaskError, match='exited with code 3'):
+        _run(pool, crash)
+    assert _run(pool, answer) == 42
@@ -0,0 +1,21 @@
+import pytest
+
+from schedulergodx.client.results import ResultCache, TaskFailedError
+
+
+def test_failures_are_cached():
+    cache = ResultCache(2)
+    cache.fail('failed', TaskFailedError('boom'))
+    cache.put('done', ValueError('a returned exception is a result'))
+    for _ in range(2):
+        with pytest.raises(TaskFailedError, match='boom'):
+            cache.get('failed')
+    assert isinstance(cache.get('done'), ValueError)
+
+
+def test_failures_are_evicted_like_results():
+    cache = ResultCache(1)
+    cache.fail('failed', TaskFailedError('boom'))
+    cache.put('done', 1)
+    assert 'failed' not in cache
+    assert cache.get('done') == 1
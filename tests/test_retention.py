@@ -0,0 +1,87 @@
+import gzip
+import json
+import logging
+import zlib
+from datetime import datetime, timedelta
+
+import schedulergodx.utils as utils
+from schedulergodx.service.retention import ArchiveMode, Retention
+from schedulergodx.utils import TaskStatus
+
+
+def _db(tmp_path) -> utils.DB:
+    return utils.DB(f'sqlite:///{tmp_path / "retention.db"}', service_db=True)
+
+
+def _row(id: str, **values) -> dict:
+    return {'id': id, 'client': 'client', 'status': TaskStatus.COMPLETED, 'time_to_start': datetime.now(),
+            'task_args': '[]', 'task_kwargs': '{}', 'lifetime': 3, 'hard': False, **values}
+
+
+def _retention(db: utils.DB, **kwargs) -> Retention:
+    return Retention(db, ttl=60, logger=logging.getLogger('test-retention'), **kwargs)
+
+
+def test_ttl_counts_from_the_finish(tmp_path):
+    db = _db(tmp_path)
+    long_ago = datetime.now() - timedelta(days=1)
+    with db.session() as session:
+        db.insert_tasks([
+            _row('old', time_to_start=long_ago, finished_at=long_ago),
+            _row('just-finished', time_to_start=long_ago, finished_at=datetime.now()),
+            _row('waiting', status=TaskStatus.WAITING, time_to_start=long_ago),
+        ], session)
+        session.commit()
+    assert _retention(db).run_batch() == 1
+    with db.session() as session:
+        assert sorted(task.id for task in session.query(db.Task)) == ['just-finished', 'waiting']
+
+
+def _finished(db: utils.DB, count: int) -> None:
+    long_ago = datetime.now() - timedelta(days=1)
+    with db.session() as session:
+        db.insert_tasks([_row(f'task-{i}', finished_at=long_ago) for i in range(count)], session)
+        session.commit()
+
+
+def test_table_archive_keeps_a_compressed_copy(tmp_path):
+    db = _db(tmp_path)
+    _finished(db, 3)
+    retention = _retention(db, archive=ArchiveMode.TABLE, batch_size=2)
+    assert retention.run_batch() == 2
+    assert retention.run_batch() == 1
+    assert retention.run_batch() == 0
+    with db.session() as session:
+        assert session.query(db.Task).count() == 0
+        archived = {row.id: json.loads(zlib.decompress(row.data)) for row in session.query(db.TaskArchive)}
+    assert sorted(archived) == ['task-0', 'task-1', 'task-2']
+    assert archived['task-0']['status'] == 'COMPLETED'
+
+
+def test_file_archive_appends_json_lines(tmp_path):
+    db = _db(tmp_path)
+    _finished(db, 2)
+    path = tmp_path / 'archive.jsonl.gz'
+    assert _retention(db, archive=ArchiveMode.FILE, archive_path=str(path)).run_batch() == 2
+    with gzip.open(path, 'rt') as file:
+        assert sorted(json.loads(line)['id'] for line in file) == ['task-0', 'task-1']
+
+
+def test_compaction_runs_once_per_interval(tmp_path, monkeypatch):
+    db = _db(tmp_path)
+    compactions = []
+    monkeypatch.setattr(db, 'compact', lambda: compactions.append(True))
+    retention = _retention(db, compaction_interval=0)
+    retention._compact()
+    retention.compaction_interval = 3600
+    retention._compact()
+    assert compactions == [True]
+    _retention(db)._compact()
+    assert compactions == [True]
+
+
+def test_sqlite_compaction(tmp_path):
+    db = _db(tmp_path)
+    _finished(db, 10)
+    _retention(db).run_batch()
+    db.compact()
@@ -0,0 +1,72 @@
+import logging
+import threading
+import time
+from functools import partial
+
+from schedulergodx.service.scheduler import Scheduler
+
+
+def _scheduler() -> Scheduler:
+    return Scheduler(logger=logging.getLogger('test-scheduler'))
+
+
+def test_callbacks_fire_in_time_order():
+    scheduler = _scheduler()
+    fired, done = [], threading.Event()
+    now = time.time()
+    for key, delay in (('c', 0.3), ('a', 0.1), ('b', 0.2)):
+        scheduler.push(key, now + delay, partial(fired.append, key))
+    scheduler.push('done', now + 0.4, done.set)
+    scheduler.start()
+    try:
+        assert done.wait(5)
+    finally:
+        scheduler.stop(5)
+    assert fired == ['a', 'b', 'c']
+
+
+def test_push_ignores_a_known_key_and_cancel_drops_it():
+    scheduler = _scheduler()
+    assert scheduler.push('task', time.time() + 60, lambda: None)
+    assert not scheduler.push('task', time.time(), lambda: None)
+    assert 'task' in scheduler and len(scheduler) == 1
+    assert scheduler.cancel('task')
+    assert not scheduler.cancel('task')
+    assert 'task' not in scheduler and len(scheduler) == 0
+
+
+def test_push_many_skips_duplicates_and_fires_the_new_head():
+    scheduler = _scheduler()
+    fired, done = [], threading.Event()
+    scheduler.push('later', time.time() + 60, lambda: fired.append('later'))
+    scheduler.start()
+    try:
+        now = time.time()
+        assert scheduler.push_many([('later', now, lambda: None), ('soon', now + 0.1, done.set)]) == 1
+        assert done.wait(5)
+    finally:
+        scheduler.stop(5)
+    assert fired == [] and 'later' in scheduler
+
+
+def test_cancelled_entries_are_compacted():
+    scheduler = _scheduler()
+    count = Scheduler._COMPACT_THRESHOLD * 2 + 2
+    scheduler.push_many((i, time.time() + 60, lambda: None) for i in range(count))
+    for i in range(count - 1):
+        scheduler.cancel(i)
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) < count // 2
+
+
+def test_a_failing_callback_does_not_stop_the_dispatcher():
+    scheduler = _scheduler()
+    done = threading.Event()
+    now = time.time()
+    scheduler.push('fails', now, lambda: 1 / 0)
+    scheduler.push('runs', now + 0.05, done.set)
+    scheduler.start()
+    try:
+        assert done.wait(5)
+    finally:
+        scheduler.stop(5)
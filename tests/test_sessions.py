@@ -0,0 +1,35 @@
+import dill
+
+import schedulergodx.utils as utils
+from schedulergodx.service.registry import FunctionRegistry
+
+
+def _square(x):
+    return x * x
+
+
+def _db(tmp_path) -> utils.SqliteDB:
+    return utils.SqliteDB(f'sqlite:///{tmp_path / "sessions.db"}', service_db=True)
+
+
+def test_registry_releases_connections(tmp_path):
+    db = _db(tmp_path)
+    registry = FunctionRegistry(db)
+    body = dill.dumps(_square)
+    hash = utils.MessageConstructor.function_hash(body)
+    registry.load()
+    registry.add(hash, body)
+    assert hash in FunctionRegistry(db)
+    assert FunctionRegistry(db).get(hash)(3) == 9
+    assert db.engine.pool.checkedout() == 0
+
+
+def test_session_is_closed_on_error(tmp_path):
+    db = _db(tmp_path)
+    try:
+        with db.session() as session:
+            db.has_function('missing', session)
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert db.engine.pool.checkedout() == 0
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import schedulergodx.utils as utils
+from schedulergodx.utils import Durability, TaskStatus, WriteBuffer
+
+
+def _db(tmp_path) -> utils.DB:
+    return utils.DB(f'sqlite:///{tmp_path / "storage.db"}', service_db=True)
+
+
+def _row(id: str, **values) -> dict:
+    return {'id': id, 'client': 'client', 'status': TaskStatus.WAITING, 'time_to_start': datetime.now(),
+            'task_args': '[]', 'task_kwargs': '{}', 'lifetime': 3, 'hard': False, **values}
+
+
+def test_redelivered_inserts_are_ignored(tmp_path):
+    db = _db(tmp_path)
+    writer = WriteBuffer(db, durability=Durability.GROUP)
+    writer.start()
+    writer.insert([_row('task')])
+    writer.insert([_row('task', client='other')])
+    writer.add_result({'id': 'task', 'client': 'client', 'encoding': 'json', 'size': 1, 'data': b'1'}, wait=True)
+    writer.add_result({'id': 'task', 'client': 'client', 'encoding': 'json', 'size': 1, 'data': b'2'}, wait=True)
+    writer.close()
+    with db.session() as session:
+        assert session.get(db.Task, 'task').client == 'client'
+        assert db.get_result('task', session).data == b'1'
+
+
+def test_renew_leases_skips_waiting_tasks_beyond_the_window(tmp_path):
+    db = _db(tmp_path)
+    now = datetime.now()
+    expired = now - timedelta(seconds=1)
+    with db.session() as session:
+        db.insert_tasks([
+            _row('running', status=TaskStatus.WORK, time_to_start=now + timedelta(hours=2)),
+            _row('soon', time_to_start=now + timedelta(minutes=1)),
+            _row('later', time_to_start=now + timedelta(hours=2)),
+        ], session)
+        session.commit()
+        session.execute(db.Task.__table__.update().values(lease_owner='node', lease_expires=expired))
+        session.commit()
+        assert db.renew_leases('node', now + timedelta(minutes=5), session,
+                               until=now + timedelta(minutes=5)) == 2
+        leases = {task.id: task.lease_expires for task in session.query(db.Task)}
+    assert leases['running'] > now and leases['soon'] > now
+    assert leases['later'] == expired
+
+
+def test_spilled_task_is_adopted_only_after_its_lease_lapses(tmp_path):
+    db = _db(tmp_path)
+    now = datetime.now()
+    with db.session() as session:
+        db.insert_tasks([_row('spilled', lease_expires=now + timedelta(minutes=1)),
+                         _row('lapsed', lease_expires=now - timedelta(seconds=1))], session)
+        session.commit()
+        adopted = db.adopt_tasks(['spilled', 'lapsed'], 'node', now + timedelta(minutes=1), session)
+    assert [row.id for row in adopted] == ['lapsed']
+
+
+def test_a_task_is_claimed_by_one_node(tmp_path):
+    db = _db(tmp_path)
+    with db.session() as session:
+        db.insert_tasks([_row('task')], session)
+        session.commit()
+        first = db.claim_tasks(session, owner='first', lease=timedelta(minutes=1), ids=['task'])
+        second = db.claim_tasks(session, owner='second', lease=timedelta(minutes=1), ids=['task'])
+    assert [(task.id, task.status, task.lease_owner) for task in first] == [('task', TaskStatus.WORK, 'first')]
+    assert second == []
+
+
+def test_expired_running_tasks_are_reclaimed(tmp_path):
+    db = _db(tmp_path)
+    now = datetime.now()
+    with db.session() as session:
+        db.insert_tasks([
+            _row('dead', status=TaskStatus.WORK, lease_owner='dead', lease_expires=now - timedelta(seconds=1)),
+            _row('alive', status=TaskStatus.WORK, lease_owner='alive', lease_expires=now + timedelta(minutes=1)),
+        ], session)
+        session.commit()
+        assert db.reclaim_expired(now, session) == 1
+        tasks = {task.id: task for task in session.query(db.Task)}
+        assert (tasks['dead'].status, tasks['dead'].lease_owner) == (TaskStatus.WAITING, None)
+        assert tasks['alive'].status is TaskStatus.WORK
+        claimed = db.claim_tasks(session, owner='other', lease=timedelta(minutes=1), ids=['dead', 'alive'])
+    assert [task.id for task in claimed] == ['dead']